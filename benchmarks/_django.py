@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def setup(**overrides):
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        options = {
+            "DEBUG": False,
+            "SECRET_KEY": "benchmark",
+            "ALLOWED_HOSTS": ["*"],
+            "INSTALLED_APPS": ["django.contrib.contenttypes", "django.contrib.auth"],
+            "ROOT_URLCONF": __name__,
+            "LANGUAGES": [("vi", "Vietnamese"), ("en", "English")],
+            "LANGUAGE_CODE": "vi",
+            "USE_I18N": True,
+        }
+        options.update(overrides)
+        settings.configure(**options)
+        django.setup()
+
+
+def timeit(func, iterations):
+    import time
+
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started_at) / iterations
+
+
+urlpatterns = []
@@ -0,0 +1,198 @@
+"""In-process fake of the B2 native API for benchmarks.
+
+Implements the subset of endpoints ``BackblazeStorage`` uses. Upload URLs accept
+one upload at a time and answer 503 when busy, like B2 does.
+"""
+import hashlib
+import itertools
+import json
+import re
+import time
+import urllib.parse
+
+from _fake_server import FakeHandler, FakeServer
+
+
+class FakeB2Server(FakeServer):
+    def __init__(self, latency=0.0, failure_rate=0.0, port=0):
+        super().__init__(FakeB2Handler, latency=latency, failure_rate=failure_rate, port=port)
+        self.files = {}
+        self.large_files = {}
+        self.busy_upload_urls = set()
+        self.ids = itertools.count(1)
+
+    def next_id(self):
+        with self.lock:
+            return next(self.ids)
+
+
+class FakeB2Handler(FakeHandler):
+    def send_json(self, data, status=200):
+        self.send_body(json.dumps(data).encode("utf-8"), status=status, content_type="application/json")
+
+    def send_unavailable(self):
+        self.send_json({"status": 503, "code": "service_unavailable"}, status=503)
+
+    def do_GET(self):
+        path = urllib.parse.urlparse(self.path).path
+
+        if path.endswith("/b2_authorize_account"):
+            if self.count("b2_authorize_account"):
+                return self.send_unavailable()
+            return self.send_json(
+                {"apiUrl": self.server.url, "downloadUrl": self.server.url, "authorizationToken": "account-token"}
+            )
+
+        if path.startswith("/file/"):
+            if self.count("download"):
+                return self.send_unavailable()
+            name = urllib.parse.unquote(path.split("/", 3)[3])
+            stored = self.server.files.get(name)
+            if stored is None:
+                return self.send_json({"status": 404, "code": "not_found"}, status=404)
+
+            data, status = stored["data"], 200
+            match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else len(data) - 1
+                data, status = data[start : end + 1], 206
+
+            return self.send_body(data, status=status)
+
+        self.send_json({"status": 404, "code": "not_found"}, status=404)
+
+    def do_POST(self):
+        path = urllib.parse.urlparse(self.path).path
+
+        if path.startswith("/upload/") or path.startswith("/upload_part/"):
+            return self.upload(path)
+
+        endpoint = path.rsplit("/", 1)[-1]
+        payload = json.loads(self.read_body() or b"{}")
+        if self.count(endpoint):
+            return self.send_unavailable()
+
+        handler = getattr(self, "api_%s" % endpoint, None)
+        if handler is None:
+            return self.send_json({"status": 400, "code": "bad_request"}, status=400)
+        return self.send_json(handler(payload))
+
+    def upload(self, path):
+        data = self.read_body()
+        if self.count("upload_part" if path.startswith("/upload_part/") else "upload"):
+            return self.send_unavailable()
+
+        with self.server.lock:
+            if path in self.server.busy_upload_urls:
+                busy = True
+            else:
+                busy = False
+                self.server.busy_upload_urls.add(path)
+        if busy:
+            with self.server.lock:
+                self.server.requests["upload_busy"] += 1
+            return self.send_unavailable()
+
+        try:
+            sha1 = self.headers.get("X-Bz-Content-Sha1")
+            if sha1 == "hex_digits_at_end":
+                data, sha1 = data[:-40], data[-40:].decode("ascii")
+            if sha1 not in (None, "do_not_verify") and hashlib.sha1(data).hexdigest() != sha1:
+                return self.send_json({"status": 400, "code": "bad_request", "message": "sha1 mismatch"}, status=400)
+
+            if path.startswith("/upload_part/"):
+                file_id = path.split("/")[2]
+                part_number = int(self.headers["X-Bz-Part-Number"])
+                with self.server.lock:
+                    self.server.large_files[file_id]["parts"][part_number] = data
+                return self.send_json(
+                    {"fileId": file_id, "partNumber": part_number, "contentLength": len(data), "contentSha1": sha1}
+                )
+
+            name = urllib.parse.unquote(self.headers["X-Bz-File-Name"])
+            return self.send_json(self.store(name, data))
+        finally:
+            with self.server.lock:
+                self.server.busy_upload_urls.discard(path)
+
+    def store(self, name, data):
+        file_id = str(self.server.next_id())
+        info = {
+            "fileId": file_id,
+            "fileName": name,
+            "contentLength": len(data),
+            "contentSha1": hashlib.sha1(data).hexdigest(),
+            "uploadTimestamp": int(time.time() * 1000),
+            "action": "upload",
+        }
+        with self.server.lock:
+            self.server.files[name] = {"data": data, "info": info}
+        return info
+
+    def api_b2_get_upload_url(self, payload):
+        upload_id = self.server.next_id()
+        return {"uploadUrl": "%s/upload/%s" % (self.server.url, upload_id), "authorizationToken": "upload-%s" % upload_id}
+
+    def api_b2_get_download_authorization(self, payload):
+        return {"authorizationToken": "download-token"}
+
+    def api_b2_list_file_names(self, payload):
+        start = payload.get("startFileName") or ""
+        prefix = payload.get("prefix") or ""
+        delimiter = payload.get("delimiter")
+        names = sorted(n for n in self.server.files if n >= start and n.startswith(prefix))
+        count = payload.get("maxFileCount", 100)
+
+        files, folders = [], set()
+        for index, name in enumerate(names):
+            if len(files) == count:
+                return {"files": files, "nextFileName": names[index]}
+            if delimiter and delimiter in name[len(prefix):]:
+                folder = name[: name.index(delimiter, len(prefix)) + 1]
+                if folder not in folders:
+                    folders.add(folder)
+                    files.append({"fileName": folder, "action": "folder", "fileId": None})
+                continue
+            files.append(self.server.files[name]["info"])
+        return {"files": files, "nextFileName": None}
+
+    def api_b2_list_file_versions(self, payload):
+        return self.api_b2_list_file_names(payload)
+
+    def api_b2_get_file_info(self, payload):
+        for stored in self.server.files.values():
+            if stored["info"]["fileId"] == payload["fileId"]:
+                return stored["info"]
+        return {}
+
+    def api_b2_delete_file_version(self, payload):
+        with self.server.lock:
+            self.server.files.pop(payload["fileName"], None)
+        return {"fileId": payload["fileId"], "fileName": payload["fileName"]}
+
+    def api_b2_start_large_file(self, payload):
+        file_id = "large-%s" % self.server.next_id()
+        with self.server.lock:
+            self.server.large_files[file_id] = {"fileName": payload["fileName"], "parts": {}}
+        return {"fileId": file_id, "fileName": payload["fileName"]}
+
+    def api_b2_get_upload_part_url(self, payload):
+        upload_id = self.server.next_id()
+        return {
+            "fileId": payload["fileId"],
+            "uploadUrl": "%s/upload_part/%s/%s" % (self.server.url, payload["fileId"], upload_id),
+            "authorizationToken": "part-%s" % upload_id,
+        }
+
+    def api_b2_finish_large_file(self, payload):
+        with self.server.lock:
+            large_file = self.server.large_files.pop(payload["fileId"])
+        parts = large_file["parts"]
+        data = b"".join(parts[number] for number in sorted(parts))
+        return self.store(large_file["fileName"], data)
+
+    def api_b2_cancel_large_file(self, payload):
+        with self.server.lock:
+            self.server.large_files.pop(payload["fileId"], None)
+        return {"fileId": payload["fileId"]}
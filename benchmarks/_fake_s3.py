@@ -0,0 +1,297 @@
+"""In-process fake of the S3 API for benchmarks.
+
+Speaks enough path-style S3 for ``MinioStorage``: put/get (with Range)/head/
+delete object, multi-object delete, ListObjectsV2 and multipart uploads.
+With ``credentials=(access_key, secret_key)`` the SigV4 ``Authorization``
+header of every request is checked against a canonical request built the way
+S3 builds it; presigned URLs are not checked.
+"""
+import hashlib
+import hmac
+import itertools
+import re
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from email.utils import formatdate
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from _fake_server import FakeHandler, FakeServer
+from minio.credentials import Credentials
+from minio.signer import sign_v4_s3
+
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+AUTHORIZATION_RE = re.compile(
+    r"AWS4-HMAC-SHA256 Credential=(?P<access_key>[^/]+)/\d{8}/(?P<region>[^/]+)/s3/aws4_request, "
+    r"SignedHeaders=(?P<signed_headers>[^,]+), Signature=[0-9a-f]{64}$"
+)
+
+
+def _uri_encode(value, safe="-_.~"):
+    return urllib.parse.quote(urllib.parse.unquote(value), safe=safe)
+
+
+class FakeS3Server(FakeServer):
+    def __init__(self, latency=0.0, failure_rate=0.0, port=0, credentials=None):
+        super().__init__(FakeS3Handler, latency=latency, failure_rate=failure_rate, port=port)
+        self.credentials = credentials
+        self.objects = {}
+        self.uploads = {}
+        self.ids = itertools.count(1)
+
+
+class FakeS3Handler(FakeHandler):
+    def parse(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        bucket, _, key = url.path.lstrip("/").partition("/")
+        return bucket, urllib.parse.unquote(key), query
+
+    def send_xml(self, body, status=200):
+        xml = '<?xml version="1.0" encoding="UTF-8"?>\n%s' % body
+        self.send_body(xml.encode("utf-8"), status=status, content_type="application/xml")
+
+    def send_error_xml(self, status, code, key=""):
+        self.send_xml(
+            "<Error><Code>%s</Code><Message>%s</Message><Key>%s</Key><RequestId>fake</RequestId></Error>"
+            % (code, code, escape(key)),
+            status=status,
+        )
+
+    def start(self, operation):
+        """Count the request; answer a bad signature or an injected failure and return ``False`` if one is due."""
+        if not self.signature_matches():
+            with self.server.lock:
+                self.server.requests["signature_mismatch"] += 1
+            self.send_error_xml(403, "SignatureDoesNotMatch")
+            return False
+        if self.count(operation):
+            self.send_error_xml(503, "SlowDown")
+            return False
+        return True
+
+    def signature_matches(self):
+        """Recompute the ``Authorization`` header from the canonical request.
+
+        The canonical query string is rebuilt from the decoded parameters, so a
+        client that leaves a reserved character such as ``/`` unencoded fails.
+        """
+        if self.server.credentials is None:
+            return True
+
+        url = urllib.parse.urlsplit(self.path)
+        if "X-Amz-Signature=" in url.query:
+            return True
+
+        match = AUTHORIZATION_RE.match(self.headers.get("Authorization", ""))
+        access_key, secret_key = self.server.credentials
+        if match is None or match["access_key"] != access_key:
+            return False
+
+        pairs = [pair.partition("=") for pair in url.query.split("&") if pair]
+        query = "&".join("%s=%s" % pair for pair in sorted((_uri_encode(k), _uri_encode(v)) for k, _, v in pairs))
+        canonical = urllib.parse.SplitResult(url.scheme, url.netloc, _uri_encode(url.path, safe="/-_.~"), query, "")
+        headers = {name: self.headers.get(name, "") for name in match["signed_headers"].split(";")}
+        date = datetime.strptime(self.headers.get("x-amz-date", ""), "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+
+        expected = sign_v4_s3(
+            method=self.command,
+            url=canonical,
+            region=match["region"],
+            headers=headers,
+            credentials=Credentials(access_key, secret_key),
+            content_sha256=self.headers.get("x-amz-content-sha256", ""),
+            date=date,
+        )["Authorization"]
+        return hmac.compare_digest(expected, self.headers["Authorization"])
+
+    def object_headers(self, stored):
+        return {
+            "ETag": '"%s"' % stored["etag"],
+            "Last-Modified": formatdate(stored["modified"], usegmt=True),
+            "Content-Type": stored["content_type"],
+            "Accept-Ranges": "bytes",
+        }
+
+    def do_HEAD(self):
+        bucket, key, query = self.parse()
+        if not self.start("stat"):
+            return
+
+        stored = self.server.objects.get(key)
+        if stored is None:
+            return self.send_body(status=404)
+
+        headers = self.object_headers(stored)
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(stored["data"])))
+        self.end_headers()
+
+    def do_GET(self):
+        bucket, key, query = self.parse()
+
+        if "location" in query:
+            if self.start("location"):
+                self.send_xml('<LocationConstraint xmlns="%s">us-east-1</LocationConstraint>' % S3_NS)
+            return
+
+        if not key:
+            if self.start("list"):
+                self.list_objects(bucket, query)
+            return
+
+        if not self.start("get"):
+            return
+
+        stored = self.server.objects.get(key)
+        if stored is None:
+            return self.send_error_xml(404, "NoSuchKey", key)
+
+        data, status = stored["data"], 200
+        headers = self.object_headers(stored)
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(data) - 1
+            headers["Content-Range"] = "bytes %d-%d/%d" % (start, min(end, len(data) - 1), len(data))
+            data, status = data[start : end + 1], 206
+
+        self.send_body(data, status=status, headers=headers)
+
+    def list_objects(self, bucket, query):
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter", "")
+        start_after = query.get("continuation-token") or query.get("start-after") or ""
+        max_keys = int(query.get("max-keys") or 1000)
+
+        contents, prefixes, next_token = [], [], None
+        for key in sorted(k for k in self.server.objects if k.startswith(prefix) and k > start_after):
+            if len(contents) + len(prefixes) == max_keys:
+                next_token = key
+                break
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                common = prefix + rest[: rest.index(delimiter) + 1]
+                if common not in prefixes:
+                    prefixes.append(common)
+                continue
+            stored = self.server.objects[key]
+            contents.append(
+                "<Contents><Key>%s</Key><LastModified>%s</LastModified><ETag>\"%s\"</ETag>"
+                "<Size>%d</Size><StorageClass>STANDARD</StorageClass></Contents>"
+                % (
+                    escape(key),
+                    time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(stored["modified"])),
+                    stored["etag"],
+                    len(stored["data"]),
+                )
+            )
+
+        self.send_xml(
+            '<ListBucketResult xmlns="%s"><Name>%s</Name><Prefix>%s</Prefix><KeyCount>%d</KeyCount>'
+            "<MaxKeys>%d</MaxKeys><IsTruncated>%s</IsTruncated>%s%s%s</ListBucketResult>"
+            % (
+                S3_NS,
+                escape(bucket),
+                escape(prefix),
+                len(contents) + len(prefixes),
+                max_keys,
+                "true" if next_token else "false",
+                "<NextContinuationToken>%s</NextContinuationToken>" % escape(next_token) if next_token else "",
+                "".join(contents),
+                "".join("<CommonPrefixes><Prefix>%s</Prefix></CommonPrefixes>" % escape(p) for p in prefixes),
+            )
+        )
+
+    def store(self, key, data, content_type):
+        stored = {
+            "data": data,
+            "etag": hashlib.md5(data).hexdigest(),
+            "modified": time.time(),
+            "content_type": content_type or "application/octet-stream",
+        }
+        with self.server.lock:
+            self.server.objects[key] = stored
+        return stored
+
+    def do_PUT(self):
+        bucket, key, query = self.parse()
+        data = self.read_body()
+
+        if "uploadId" in query:
+            if not self.start("upload_part"):
+                return
+            upload = self.server.uploads.get(query["uploadId"])
+            if upload is None:
+                return self.send_error_xml(404, "NoSuchUpload", key)
+            etag = hashlib.md5(data).hexdigest()
+            with self.server.lock:
+                upload["parts"][int(query["partNumber"])] = data
+            return self.send_body(headers={"ETag": '"%s"' % etag})
+
+        if not self.start("put"):
+            return
+        stored = self.store(key, data, self.headers.get("Content-Type"))
+        self.send_body(headers={"ETag": '"%s"' % stored["etag"]})
+
+    def do_POST(self):
+        bucket, key, query = self.parse()
+        body = self.read_body()
+
+        if "delete" in query:
+            if not self.start("delete_many"):
+                return
+            root = ElementTree.fromstring(body)
+            deleted = []
+            for element in root.iter("{%s}Key" % S3_NS):
+                with self.server.lock:
+                    self.server.objects.pop(element.text, None)
+                deleted.append("<Deleted><Key>%s</Key></Deleted>" % escape(element.text))
+            return self.send_xml('<DeleteResult xmlns="%s">%s</DeleteResult>' % (S3_NS, "".join(deleted)))
+
+        if "uploads" in query:
+            if not self.start("create_multipart"):
+                return
+            # Real upload ids are opaque and may contain reserved characters such as "/", "+" and "=".
+            upload_id = "upload/%d+id=" % next(self.server.ids)
+            with self.server.lock:
+                self.server.uploads[upload_id] = {"key": key, "parts": {}, "content_type": self.headers.get("Content-Type")}
+            return self.send_xml(
+                '<InitiateMultipartUploadResult xmlns="%s"><Bucket>%s</Bucket><Key>%s</Key>'
+                "<UploadId>%s</UploadId></InitiateMultipartUploadResult>" % (S3_NS, escape(bucket), escape(key), upload_id)
+            )
+
+        if "uploadId" in query:
+            if not self.start("complete_multipart"):
+                return
+            with self.server.lock:
+                upload = self.server.uploads.pop(query["uploadId"], None)
+            if upload is None:
+                return self.send_error_xml(404, "NoSuchUpload", key)
+            parts = upload["parts"]
+            stored = self.store(key, b"".join(parts[n] for n in sorted(parts)), upload["content_type"])
+            return self.send_xml(
+                '<CompleteMultipartUploadResult xmlns="%s"><Location>%s</Location><Bucket>%s</Bucket>'
+                "<Key>%s</Key><ETag>\"%s\"</ETag></CompleteMultipartUploadResult>"
+                % (S3_NS, escape(self.server.url + self.path), escape(bucket), escape(key), stored["etag"])
+            )
+
+        self.send_error_xml(400, "InvalidRequest", key)
+
+    def do_DELETE(self):
+        bucket, key, query = self.parse()
+
+        if "uploadId" in query:
+            if self.start("abort_multipart"):
+                with self.server.lock:
+                    self.server.uploads.pop(query["uploadId"], None)
+                self.send_body(status=204)
+            return
+
+        if self.start("delete"):
+            with self.server.lock:
+                self.server.objects.pop(key, None)
+            self.send_body(status=204)
@@ -0,0 +1,107 @@
+"""Shared plumbing for the in-process fake object-store servers."""
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Threaded HTTP server on 127.0.0.1.
+
+    ``latency`` seconds are added to every request and ``failure_rate`` of the
+    requests are answered with a 503 before they are handled.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler_class, latency=0.0, failure_rate=0.0, port=0):
+        super().__init__(("127.0.0.1", port), handler_class)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = Counter()
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://%s:%s" % self.server_address
+
+    @property
+    def netloc(self):
+        return "%s:%s" % self.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Clients close ranged downloads early; that is not an error here.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, small responses stall on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def send_body(self, body=b"", status=200, content_type=None, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def count(self, operation):
+        """Record ``operation``, apply the latency and return ``True`` if a failure is injected."""
+        with self.server.lock:
+            self.server.requests[operation] += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.failure_rate and random.random() < self.server.failure_rate:
+            with self.server.lock:
+                self.server.requests["injected_failure"] += 1
+            return True
+        return False
+
+
+def _serve(server_class, options, connection):
+    server = server_class(**options)
+    connection.send(server.server_address)
+    server.serve_forever()
+
+
+def start_in_process(server_class, **options):
+    """Run ``server_class`` in a child process so it does not share the benchmark's memory or GIL.
+
+    Returns the process and the server's ``host:port``; terminate the process when done.
+    """
+    import multiprocessing
+
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(server_class, options, child), daemon=True)
+    process.start()
+    return process, "%s:%s" % parent.recv()
@@ -0,0 +1,74 @@
+"""Concurrent small-file uploads to BackblazeStorage against a local fake B2 server.
+
+Compares fetching a new upload URL for every file with the pooled upload URLs.
+
+Usage: python benchmarks/backblaze_uploads.py [files] [threads] [latency_ms]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _django import setup
+
+setup()
+
+from _fake_b2 import FakeB2Server
+from django.core.files.base import ContentFile
+
+from idtinc.integration.storage.backblaze import BackblazeStorage
+
+
+class UnpooledUploadUrls:
+    """Previous behaviour: a new upload URL for every upload."""
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+
+    def acquire(self):
+        return self._fetch()
+
+    def release(self, upload):
+        pass
+
+    def discard(self, upload):
+        pass
+
+
+def make_storage(server, pooled, threads):
+    storage_class = type("BenchmarkBackblazeStorage", (BackblazeStorage,), {"authorize_url": server.url + "/b2api/v2/b2_authorize_account"})
+    storage = storage_class(
+        app_key="key",
+        account_id="account",
+        bucket_name="bucket",
+        bucket_id="bucket-id",
+        pool_size=threads,
+        upload_concurrency=threads,
+    )
+    if not pooled:
+        storage._upload_urls = UnpooledUploadUrls(storage._get_upload_url)
+    return storage
+
+
+def main(files=500, threads=16, latency_ms=5):
+    payload = b"x" * 4096
+
+    for pooled in (False, True):
+        server = FakeB2Server(latency=latency_ms / 1000).start()
+        storage = make_storage(server, pooled, threads)
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda i: storage.save("bench/%05d.bin" % i, ContentFile(payload)), range(files)))
+        elapsed = time.perf_counter() - started_at
+
+        requests = server.requests
+        print(
+            f"{'pooled' if pooled else 'unpooled':<9} {files / elapsed:8.1f} files/s  "
+            f"get_upload_url={requests['b2_get_upload_url']:<5} uploads={requests['upload']:<5} "
+            f"503s={requests['upload_busy']:<4} connections={server.connections}"
+        )
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:4]))
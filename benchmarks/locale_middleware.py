@@ -0,0 +1,71 @@
+"""Accept-Language negotiation of CustomLocaleMiddleware: edge-case self-check and per-request cost.
+
+The checks run first and abort on a wrong resolution (LANGUAGES is vi, en; the default is vi).
+
+Usage: python benchmarks/locale_middleware.py [iterations]
+"""
+import sys
+
+from _django import setup, timeit
+
+setup()
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from idtinc.integration.middleware import CustomLocaleMiddleware
+
+CASES = [
+    # (lang param, Accept-Language, expected)
+    (None, "", "vi"),
+    (None, "en", "en"),
+    (None, "vi-VN,vi;q=0.9,en;q=0.8", "vi"),
+    (None, "fr-FR,en-US;q=0.7,vi;q=0.5", "en"),
+    (None, "vi;q=0.5,en;q=0.9", "en"),
+    (None, "EN_us", "en"),
+    (None, "en;q=0,vi", "vi"),
+    (None, "en;q=0", "vi"),
+    (None, "en;q=0.0, fr", "vi"),
+    (None, "fr;q=0.9, en;q=0.8", "en"),
+    (None, "en;q=abc, vi;q=0.1", "vi"),
+    (None, "en;q=5, vi;q=0.9", "en"),
+    (None, "*", "vi"),
+    (None, "fr, *;q=0.5", "vi"),
+    (None, "vi;q=0, *", "en"),
+    (None, "*;q=0", "vi"),
+    (None, "fr, *;q=0.5, en;q=0.6", "en"),
+    (None, " , ;q=1, en ;q=0.4", "en"),
+    ("en", "vi", "en"),
+    ("xx", "en", "en"),
+]
+
+
+def check(middleware):
+    for lang_param, header, expected in CASES:
+        resolved = middleware.resolve_language(lang_param, header)
+        assert resolved == expected, f"lang={lang_param!r} Accept-Language={header!r}: {resolved!r} != {expected!r}"
+    print(f"{len(CASES)} Accept-Language cases resolved as expected")
+
+
+def main(iterations=50000):
+    factory = RequestFactory()
+    response = HttpResponse("ok")
+    middleware = CustomLocaleMiddleware(lambda request: response)
+    check(middleware)
+
+    for header in ("vi-VN,vi;q=0.9,en;q=0.8", "fr, *;q=0.5"):
+        def run():
+            request = factory.get("/", HTTP_ACCEPT_LANGUAGE=header)
+            middleware.process_request(request)
+            middleware.process_response(request, response)
+
+        baseline = timeit(lambda: factory.get("/", HTTP_ACCEPT_LANGUAGE=header), iterations)
+        elapsed = timeit(run, iterations) - baseline
+        print(f"{header:<36} {elapsed * 1e6:8.2f} us/request")
+
+        uncached = timeit(lambda: middleware._resolve_language(None, header), iterations)
+        print(f"{header + ' (uncached)':<36} {uncached * 1e6:8.2f} us/resolution")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
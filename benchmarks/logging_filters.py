@@ -0,0 +1,129 @@
+"""SamplingFilter and RateLimitFilter: edge-case self-check and cost per record.
+
+The checks run first and abort on a wrong decision; the rate-limit refill checks sleep for about half a second.
+
+Usage: python benchmarks/logging_filters.py [records]
+"""
+import logging
+import sys
+import time
+
+from _django import setup
+
+setup()
+
+from django.test import override_settings
+
+from idtinc.integration.logging.formatters import RateLimitFilter, SamplingFilter
+
+
+def make_record(name="response", level=logging.INFO, msg="/api/v1/items/1 [GET]", lineno=10, **extra):
+    record = logging.LogRecord(name, level, __file__, lineno, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def check_sampling():
+    sampling = SamplingFilter(rates={"response": 0.25, "request": 0.0})
+    kept = sum(sampling.filter(make_record()) for _ in range(100000))
+    assert 24000 < kept < 26000, f"rate 0.25 kept {kept} of 100000"
+
+    assert not any(sampling.filter(make_record("request")) for _ in range(1000)), "rate 0 must drop everything"
+    assert sampling.filter(make_record("request", logging.ERROR)), "ERROR must never be sampled out"
+    assert sampling.filter(make_record("request", suppressed=3)), "rate-limit summaries must never be sampled out"
+    assert all(sampling.filter(make_record("exception")) for _ in range(1000)), "unlisted loggers keep everything"
+
+
+def check_rate_limit():
+    assert all(RateLimitFilter(rate=None).filter(make_record()) for _ in range(1000)), "no rate must not limit"
+
+    slow = RateLimitFilter(rate=0.5)
+    passed = [slow.filter(make_record()) for _ in range(3)]
+    assert passed == [True, False, False], f"a rate below 1 still lets one record through: {passed}"
+
+    with override_settings(LOGGING_RATE_LIMIT={"rate": 1, "burst": 1, "max_fingerprints": 5, "summary_interval": 5}):
+        configured = RateLimitFilter(burst=3, max_fingerprints=50, summary_interval=1)
+        assert (configured.rate, configured.burst) == (1, 3), "rate from settings, burst from the argument"
+        assert (configured.max_fingerprints, configured.summary_interval) == (50, 1), "arguments win over settings"
+        assert RateLimitFilter().max_fingerprints == 5, "settings win over defaults"
+
+    limiter = RateLimitFilter(rate=10, burst=5)
+
+    # Messages that only differ by path come from one call site and share a bucket.
+    passed = [limiter.filter(make_record(msg=f"/api/v1/items/{i} [GET]")) for i in range(8)]
+    assert passed == [True] * 5 + [False] * 3, f"burst of 5: {passed}"
+
+    assert limiter.filter(make_record(lineno=20)), "another call site has its own bucket"
+    assert limiter.filter(make_record(level=logging.WARNING)), "another level has its own bucket"
+    assert limiter.filter(make_record(fingerprint="abc")), "an exception fingerprint has its own bucket"
+
+    # 10 records/s: about two tokens after 0.25 s.
+    time.sleep(0.25)
+    record = make_record()
+    assert limiter.filter(record), "bucket must refill"
+    assert record.suppressed == 3 and record.getMessage().endswith("(suppressed 3 similar messages)"), record.msg
+    record = make_record()
+    assert limiter.filter(record) and not getattr(record, "suppressed", 0), "count is reported once"
+    assert not limiter.filter(make_record()), "refill is capped by the elapsed time"
+
+    # A fingerprint that never logs again is reported by flush() through its logger.
+    handler = ListHandler()
+    logger = logging.getLogger("selfcheck")
+    logger.addHandler(handler)
+    logger.propagate = False
+    handler.addFilter(limiter)
+
+    passed = [limiter.filter(make_record("selfcheck", fingerprint="storm")) for _ in range(9)]
+    assert passed == [True] * 5 + [False] * 4, f"burst of 5: {passed}"
+    limiter.flush()
+    summaries = [r.getMessage() for r in handler.records]
+    assert summaries == ["/api/v1/items/1 [GET] (suppressed 4 similar messages)"], summaries
+    assert limiter.filter(handler.records[0]), "summaries bypass the limit"
+    handler.records.clear()
+    limiter.flush()
+    assert not handler.records, "nothing pending after a flush"
+
+    # Suppressions of evicted fingerprints are still reported.
+    small = RateLimitFilter(rate=1, burst=1, max_fingerprints=2, summary_interval=0.2)
+    handler.filters.clear()
+    handler.addFilter(small)
+    for _ in range(3):
+        small.filter(make_record("selfcheck", lineno=50))
+    small.filter(make_record("selfcheck", lineno=51))
+    small.filter(make_record("selfcheck", lineno=52))
+    time.sleep(0.4)
+    summaries = [r.getMessage() for r in handler.records]
+    assert summaries == ["/api/v1/items/1 [GET] (suppressed 2 similar messages)"], summaries
+
+
+def measure(log_filter, records):
+    started_at = time.perf_counter()
+    for record in records:
+        log_filter.filter(record)
+    return len(records) / (time.perf_counter() - started_at)
+
+
+def main(count=200000):
+    check_sampling()
+    check_rate_limit()
+    print("SamplingFilter and RateLimitFilter checks passed")
+
+    records = [make_record(msg=f"/api/v1/items/{i} [GET]", lineno=i % 50) for i in range(count)]
+    for label, log_filter in (
+        ("SamplingFilter (rate 0.1)", SamplingFilter(rates={"response": 0.1})),
+        ("RateLimitFilter (50 sites)", RateLimitFilter(rate=5, burst=20, summary_interval=3600)),
+    ):
+        print(f"{label:<28} {measure(log_filter, records):>12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
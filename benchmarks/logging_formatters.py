@@ -0,0 +1,69 @@
+"""Throughput of the logging formatters in records per second.
+
+Usage: python benchmarks/logging_formatters.py [records]
+"""
+import logging
+import sys
+
+from _django import setup
+
+setup(SERVER_ORIGIN="benchmark")
+
+import time
+
+from idtinc.integration.logging.formatters import (ColoredFormatter,
+                                                   ExceptionLogFormatter,
+                                                   JsonLogFormatter,
+                                                   RequestLogFormatter,
+                                                   get_project_name)
+
+
+class LegacyRequestLogFormatter(RequestLogFormatter):
+    def format(self, record):
+        self.project_name = get_project_name()
+        return super().format(record)
+
+
+def make_records(count):
+    records = []
+    try:
+        raise ValueError("invalid payload")
+    except ValueError:
+        exc_info = sys.exc_info()
+
+    for i in range(count):
+        extra = {"request_path": f"/api/v1/items/{i}", "request_method": "GET", "status_code": 200, "latency_ms": 1.5}
+        record = logging.LogRecord("response", logging.WARNING, __file__, 1, "%s [%s]", (extra["request_path"], 200), None)
+        record.__dict__.update(extra)
+        records.append(record)
+
+    error = logging.LogRecord("exception", logging.ERROR, __file__, 1, "/api/v1/items [POST]", None, exc_info)
+    error.error = True
+    return records, error
+
+
+def measure(formatter, records):
+    started_at = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - started_at)
+
+
+def main(count=100000):
+    records, error = make_records(count)
+
+    for formatter in (
+        LegacyRequestLogFormatter(),
+        RequestLogFormatter(),
+        ColoredFormatter(),
+        JsonLogFormatter(),
+    ):
+        print(f"{type(formatter).__name__:<28} {measure(formatter, records):>12,.0f} records/s")
+
+    errors = [error] * max(count // 100, 1)
+    for formatter in (ExceptionLogFormatter(), JsonLogFormatter()):
+        print(f"{type(formatter).__name__ + ' (exc_info)':<28} {measure(formatter, errors):>12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""Per-request overhead of ExceptionMiddleware.
+
+Usage: python benchmarks/middleware.py [iterations]
+"""
+import logging
+import sys
+
+from _django import setup, timeit
+
+setup()
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from idtinc.integration.middleware import ExceptionMiddleware
+
+logging.getLogger("request").disabled = True
+logging.getLogger("response").disabled = True
+
+
+class LegacyExceptionMiddleware(ExceptionMiddleware):
+    def should_log_request(self, request):
+        path = request.path.rstrip("/")
+        excluded_paths = [p.rstrip("/") for p in self.EXCLUDED_PATHS]
+
+        if path in excluded_paths:
+            return False
+
+        for excluded_path in self.EXCLUDED_PATHS:
+            if excluded_path.endswith("/") and path.startswith(excluded_path.rstrip("/")):
+                return False
+
+        return True
+
+
+def main(iterations=50000):
+    factory = RequestFactory()
+    response = HttpResponse("ok")
+
+    for path in ("/api/v1/users/", "/static/css/app.css"):
+        for middleware_class in (LegacyExceptionMiddleware, ExceptionMiddleware):
+            middleware = middleware_class(lambda request: response)
+
+            def run():
+                request = factory.get(path)
+                middleware.process_request(request)
+                middleware.process_response(request, response)
+
+            baseline = timeit(lambda: factory.get(path), iterations)
+            elapsed = timeit(run, iterations) - baseline
+            print(f"{middleware_class.__name__:<28} {path:<22} {elapsed * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,113 @@
+"""MinioStorage request signing: self-check against a signature-verifying fake S3 server, and cost per request.
+
+Both the Minio client (sync API) and the httpx path (async API) must produce
+signatures the fake server accepts for awkward object names and for query
+values with reserved characters (multipart upload ids contain "/", "+" and "=").
+A request signed over an unencoded "/" must be rejected, so the check cannot
+pass vacuously. Requires httpx.
+
+Usage: python benchmarks/minio_signing.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+from _django import setup
+
+setup()
+
+import urllib3
+from _fake_s3 import FakeS3Server
+from django.core.files.base import ContentFile
+from minio.credentials import Credentials
+from minio.signer import sign_v4_s3
+from minio.time import to_amz_date, utcnow
+
+from idtinc.integration.storage import MinioStorage
+from idtinc.integration.storage.aio import close_async_clients
+from idtinc.integration.storage.sigv4 import UNSIGNED_PAYLOAD, object_url
+
+NAMES = ["plain.txt", "dir/with space+plus&equals=.txt", "unicodé/ñ (1)!'*.bin", "tilde~_-.bin", "a//double.txt"]
+
+
+def make_storage(server):
+    return MinioStorage(
+        bucket_name="bucket",
+        endpoint=server.netloc,
+        access_key="key",
+        secret_key="secret",
+        secure=False,
+        part_size=5 * 1024 * 1024,
+    )
+
+
+def check_sync(storage):
+    for name in NAMES:
+        saved = storage.save(name, ContentFile(name.encode("utf-8")))
+        assert storage.exists(saved) and storage.open(saved).read() == name.encode("utf-8"), name
+        storage.delete(saved)
+
+
+async def check_async(storage):
+    for name in NAMES:
+        saved = await storage.asave(name, ContentFile(name.encode("utf-8")))
+        assert await storage.aexists(saved), name
+        async with await storage.aopen(saved) as f:
+            assert await f.read() == name.encode("utf-8"), name
+        await storage.adelete(saved)
+
+    data = os.urandom(11 * 1024 * 1024)
+    saved = await storage.asave("multipart/big.bin", ContentFile(data))
+    async with await storage.aopen(saved) as f:
+        assert await f.read() == data, "multipart upload"
+    await close_async_clients()
+
+
+def check_rejects_unencoded_slash(server):
+    url = object_url(server.url, "bucket", "plain.txt") + "?uploadId=upload/1"
+    date = utcnow()
+    headers = {"Host": server.netloc, "x-amz-date": to_amz_date(date), "x-amz-content-sha256": UNSIGNED_PAYLOAD}
+    headers = sign_v4_s3(
+        method="DELETE",
+        url=urlsplit(url),
+        region="us-east-1",
+        headers=headers,
+        credentials=Credentials("key", "secret"),
+        content_sha256=UNSIGNED_PAYLOAD,
+        date=date,
+    )
+    response = urllib3.request("DELETE", url, headers=headers, retries=False)
+    assert response.status == 403, f"a raw '/' in the query must not verify, got HTTP {response.status}"
+
+
+def main(iterations=20000):
+    server = FakeS3Server(credentials=("key", "secret")).start()
+    try:
+        storage = make_storage(server)
+        check_sync(storage)
+        asyncio.run(check_async(storage))
+        assert server.requests["signature_mismatch"] == 0, dict(server.requests)
+        check_rejects_unencoded_slash(server)
+        assert server.requests["signature_mismatch"] == 1, dict(server.requests)
+        print("MinioStorage signing checks passed")
+
+        query = {"partNumber": "1", "uploadId": "upload/1+id="}
+        body = os.urandom(1024 * 1024)
+        for label, args in (
+            ("HEAD", ("HEAD", "us-east-1", NAMES[1])),
+            ("PUT part, UNSIGNED-PAYLOAD", ("PUT", "us-east-1", NAMES[1], query)),
+            ("PUT 1 MiB, hashed payload", ("PUT", "us-east-1", NAMES[1], query, None, body)),
+        ):
+            count = iterations if len(args) < 6 else max(1, iterations // 100)
+            started_at = time.perf_counter()
+            for _ in range(count):
+                storage._sign(*args)
+            print(f"{label:<28} {(time.perf_counter() - started_at) / count * 1e6:>10.1f} us/request")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
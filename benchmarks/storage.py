@@ -0,0 +1,197 @@
+"""Throughput, latency percentiles and peak memory of storage backend operations.
+
+Runs MinioStorage and BackblazeStorage against the local fake S3/B2 servers
+(in a child process) for every combination of file size and concurrency.
+Peak memory is the client's tracemalloc peak for one batch of ``concurrency``
+operations, measured separately from the timed run. The ``sync`` mode runs
+``concurrency`` threads; the ``async`` mode runs ``concurrency`` coroutines of
+the async API on one event loop (requires httpx).
+
+Usage: python benchmarks/storage.py [--backends minio,backblaze] [--sizes 1024,1048576,16777216]
+                                    [--concurrency 1,8] [--ops 40] [--latency-ms 2] [--failure-rate 0]
+                                    [--modes sync,async]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from _django import setup
+
+setup()
+
+from _fake_b2 import FakeB2Server
+from _fake_s3 import FakeS3Server
+from _fake_server import start_in_process
+from django.core.files.base import ContentFile
+
+from idtinc.integration.storage import BackblazeStorage, MinioStorage
+
+
+def make_minio(netloc):
+    return MinioStorage(bucket_name="bench", endpoint=netloc, access_key="key", secret_key="secret", secure=False)
+
+
+def make_backblaze(netloc):
+    storage_class = type(
+        "BenchmarkBackblazeStorage",
+        (BackblazeStorage,),
+        {"authorize_url": "http://%s/b2api/v2/b2_authorize_account" % netloc},
+    )
+    return storage_class(app_key="key", account_id="account", bucket_name="bench", bucket_id="bench")
+
+
+BACKENDS = {
+    "minio": (FakeS3Server, make_minio),
+    "backblaze": (FakeB2Server, make_backblaze),
+}
+
+
+def read_all(storage, name):
+    with storage.open(name) as f:
+        for _chunk in f.chunks():
+            pass
+
+
+def operations(storage, payload):
+    return {
+        "save": lambda name: storage.save(name, ContentFile(payload)),
+        "exists": storage.exists,
+        "open": lambda name: read_all(storage, name),
+        "delete": storage.delete,
+    }
+
+
+async def aread_all(storage, name):
+    async with await storage.aopen(name) as f:
+        async for _chunk in f:
+            pass
+
+
+def async_operations(storage, payload):
+    return {
+        "save": lambda name: storage.asave(name, ContentFile(payload)),
+        "exists": storage.aexists,
+        "open": lambda name: aread_all(storage, name),
+        "delete": storage.adelete,
+    }
+
+
+def timed(func, names, concurrency):
+    def run(name):
+        started_at = time.perf_counter()
+        func(name)
+        return time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(run, names))
+    return time.perf_counter() - started_at, latencies
+
+
+def peak_memory(func, names, concurrency):
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(func, names))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# One loop for the whole run, so the async client's connections are reused like in a long-lived ASGI worker.
+loop = asyncio.new_event_loop()
+
+
+async def gather_limited(func, names, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(name):
+        async with slots:
+            started_at = time.perf_counter()
+            await func(name)
+            return time.perf_counter() - started_at
+
+    return await asyncio.gather(*map(run, names))
+
+
+def async_timed(func, names, concurrency):
+    started_at = time.perf_counter()
+    latencies = loop.run_until_complete(gather_limited(func, names, concurrency))
+    return time.perf_counter() - started_at, latencies
+
+
+def async_peak_memory(func, names, concurrency):
+    tracemalloc.start()
+    try:
+        loop.run_until_complete(gather_limited(func, names, concurrency))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+MODES = {
+    "sync": (operations, timed, peak_memory),
+    "async": (async_operations, async_timed, async_peak_memory),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="minio,backblaze")
+    parser.add_argument("--sizes", default="1024,1048576,16777216")
+    parser.add_argument("--concurrency", default="1,8")
+    parser.add_argument("--ops", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=2)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    parser.add_argument("--modes", default="sync")
+    args = parser.parse_args()
+
+    print(
+        f"{'backend':<10} {'mode':<5} {'size':>9} {'conc':>4} {'op':<7} {'ops/s':>8} {'MiB/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak MiB':>9}"
+    )
+
+    for backend in args.backends.split(","):
+        server_class, make_storage = BACKENDS[backend]
+        process, netloc = start_in_process(
+            server_class, latency=args.latency_ms / 1000, failure_rate=args.failure_rate
+        )
+        try:
+            storage = make_storage(netloc)
+
+            for size in map(int, args.sizes.split(",")):
+                payload = os.urandom(size)
+
+                for mode in args.modes.split(","):
+                    make_operations, run_timed, run_peak_memory = MODES[mode]
+
+                    for concurrency in map(int, args.concurrency.split(",")):
+                        names = ["bench/%s/%d/%d/%05d.bin" % (mode, size, concurrency, i) for i in range(args.ops)]
+                        memory_names = [
+                            "bench/%s/%d/%d/memory-%05d.bin" % (mode, size, concurrency, i) for i in range(concurrency)
+                        ]
+
+                        for op, func in make_operations(storage, payload).items():
+                            elapsed, latencies = run_timed(func, names, concurrency)
+                            peak = run_peak_memory(func, memory_names, concurrency)
+
+                            percentiles = (
+                                statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+                            )
+                            moved = size * len(names) if op in ("save", "open") else 0
+                            print(
+                                f"{backend:<10} {mode:<5} {size:>9} {concurrency:>4} {op:<7} "
+                                f"{len(names) / elapsed:>8.1f} {moved / elapsed / 2 ** 20:>8.2f} "
+                                f"{percentiles[49] * 1000:>8.2f} {percentiles[94] * 1000:>8.2f} "
+                                f"{percentiles[98] * 1000:>8.2f} {peak / 2 ** 20:>9.2f}"
+                            )
+        finally:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -94,6 +94,11 @@ class Msg:
     EMPTY_FILE = "Tệp tải lên rỗng."
     FILE_TOO_LARGE = "Dung lượng tệp không được vượt quá %(size)d.%(size_type)s. Dung lượng hiện tại: %(file_size)d.%(size_type)s."
     FILE_EXTENSION_INVALID = "Định dạng tệp '%(extension)s' không được phép. Các định dạng cho phép: %(allowed_extensions)s."
+    FILE_CONTENT_TYPE_INVALID = "Loại tệp '%(content_type)s' không được phép."
+    UPLOAD_SIZE_EXCEEDED = "Dung lượng tệp không được vượt quá %(max_size)d bytes."
+    UPLOAD_TICKET_INVALID = "Phiếu tải lên không hợp lệ hoặc đã hết hạn."
+    UPLOAD_NOT_FOUND = "Không tìm thấy tệp đã tải lên."
+    UPLOAD_NOT_SUPPORTED = "Storage hiện tại không hỗ trợ tải lên trực tiếp."
 
     INVALID_DATE_FORMAT = "Định dạng ngày không hợp lệ. Định dạng đúng: %(format)s"
     INVALID_TIME_FORMAT = "Định dạng thời gian không hợp lệ. Định dạng đúng: %(format)s"
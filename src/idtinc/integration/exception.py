@@ -1,5 +1,6 @@
 import json
 import logging
+import time
 
 from django.core.exceptions import (EmptyResultSet, FieldDoesNotExist,
                                     FieldError, ImproperlyConfigured,
@@ -21,6 +22,7 @@ from rest_framework.views import exception_handler
 from idtinc.core.message import Msg
 from idtinc.core.status import HttpStatus
 
+from .logging.formatters import get_exception_fingerprint
 from .response import APIResponse
 from .validators import MessageError, ValidationDetailError
 
@@ -139,12 +141,18 @@ def custom_exception_handler(exc, context):
     request = context.get("request")
     view = context.get("view")
 
+    status, message = _get_status_and_message(exc, response)
+    started_at = getattr(request, "_started_at", None) if request else None
+
     exception_info = {
         "exception_type": type(exc).__name__,
         "exception_message": str(exc),
         "request_path": request.path if request else "Unknown",
         "request_method": request.method if request else "Unknown",
         "view_name": view.__class__.__name__ if view else "Unknown",
+        "status_code": status.value,
+        "latency_ms": round((time.perf_counter() - started_at) * 1000, 3) if started_at else None,
+        "fingerprint": get_exception_fingerprint((type(exc), exc, exc.__traceback__)),
         "error": True,
     }
 
@@ -153,8 +161,6 @@ def custom_exception_handler(exc, context):
         exc_info=True,
         extra=exception_info,
     )
-
-    status, message = _get_status_and_message(exc, response)
     should_flatten = _should_flatten_errors(exc)
 
     if should_flatten and response:
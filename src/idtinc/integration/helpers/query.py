@@ -167,4 +167,11 @@ def get_choice_value(choices, value):
 
 
 def get_storage_url(name):
-    return default_storage.url(name)
\ No newline at end of file
+    return default_storage.url(name)
+
+
+def get_storage_urls(names, storage=None):
+    storage = storage or default_storage
+    if hasattr(storage, "urls"):
+        return storage.urls(names)
+    return [storage.url(name) for name in names]
\ No newline at end of file
@@ -1,6 +1,9 @@
 from .formatters import (BaseColoredFormatter, ColoredFormatter,
-                         ExceptionLogFormatter, RequestLogFormatter,
-                         ResponseLogFormatter, ServerLogFormatter)
+                         ExceptionLogFormatter, JsonLogFormatter,
+                         RateLimitFilter, RequestLogFormatter,
+                         ResponseLogFormatter, SamplingFilter,
+                         ServerLogFormatter)
+from .handlers import QueueStreamHandler
 from .setup import get_setup_logging
 
 __all__ = [
@@ -11,4 +14,8 @@ __all__ = [
     "RequestLogFormatter",
     "ResponseLogFormatter",
     "ServerLogFormatter",
+    "JsonLogFormatter",
+    "SamplingFilter",
+    "RateLimitFilter",
+    "QueueStreamHandler",
 ]
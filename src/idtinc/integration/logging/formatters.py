@@ -1,6 +1,14 @@
+import atexit
+import hashlib
+import json
 import logging
+import random
 import sys
+import threading
+import time
 import traceback
+import weakref
+from collections import OrderedDict
 
 
 def get_project_name():
@@ -15,6 +23,14 @@ def get_project_name():
     
     return project_name
 
+
+def get_exception_fingerprint(exc_info):
+    exc_type, _exc_value, exc_traceback = exc_info
+    frames = [f"{frame.filename}:{frame.name}" for frame in traceback.extract_tb(exc_traceback)]
+    signature = "|".join([getattr(exc_type, "__qualname__", str(exc_type)), *frames])
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+
+
 _COLORS = {
     "info": "\033[32m",
     "debug": "\033[36m",
@@ -29,6 +45,7 @@ class BaseColoredFormatter(logging.Formatter):
     def __init__(self, use_colors=True):
         super().__init__()
         self.use_colors = use_colors and sys.stdout.isatty()
+        self.project_name = get_project_name()
 
     def _get_colored_level(self, level_name):
         level = level_name.lower()
@@ -40,7 +57,7 @@ class BaseColoredFormatter(logging.Formatter):
 class ColoredFormatter(BaseColoredFormatter):
     def format(self, record):
         colored_level = self._get_colored_level(record.levelname)
-        return f"[{colored_level}] {get_project_name()}: {record.getMessage()}"
+        return f"[{colored_level}] {self.project_name}: {record.getMessage()}"
 
 
 class ExceptionLogFormatter(BaseColoredFormatter):
@@ -57,7 +74,7 @@ class ExceptionLogFormatter(BaseColoredFormatter):
             if self.use_colors:
                 _traceback_str = f"{_COLORS['error']}{_traceback_str}{_COLORS['RESET']}"
             message = f"{message} → {prefix}\n{_traceback_str}"
-        return f"[{colored_level}] {get_project_name()}: {message}"
+        return f"[{colored_level}] {self.project_name}: {message}"
 
 
 class RequestLogFormatter(BaseColoredFormatter):
@@ -67,7 +84,7 @@ class RequestLogFormatter(BaseColoredFormatter):
         if self.use_colors:
             prefix = f"{_COLORS['info']}request{_COLORS['RESET']}"
 
-        return f"[{colored_level}] {get_project_name()}: {record.getMessage()} → {prefix}"
+        return f"[{colored_level}] {self.project_name}: {record.getMessage()} → {prefix}"
 
 
 class ResponseLogFormatter(BaseColoredFormatter):
@@ -78,7 +95,7 @@ class ResponseLogFormatter(BaseColoredFormatter):
         if self.use_colors:
             prefix = f"{_COLORS['debug']}response{_COLORS['RESET']}"
 
-        return f"[{colored_level}] {get_project_name()}: {record.getMessage()} → {prefix}"
+        return f"[{colored_level}] {self.project_name}: {record.getMessage()} → {prefix}"
 
 
 class ServerLogFormatter(BaseColoredFormatter):
@@ -97,16 +114,214 @@ class ServerLogFormatter(BaseColoredFormatter):
             if self.use_colors:
                 message = f"{_COLORS['warning']}{message}{_COLORS['RESET']}"
 
-        return f"[{colored_level}] {get_project_name()}: {message}"
+        return f"[{colored_level}] {self.project_name}: {message}"
+
+
+class JsonLogFormatter(logging.Formatter):
+    EXTRA_FIELDS = {
+        "request_path": "path",
+        "request_method": "method",
+        "status_code": "status",
+        "latency_ms": "latency_ms",
+        "storage_ms": "storage_ms",
+        "view_name": "view",
+        "exception_type": "exception_type",
+        "exception_message": "exception_message",
+        "fingerprint": "fingerprint",
+    }
+
+    def __init__(self, include_traceback=True):
+        super().__init__()
+        self.include_traceback = include_traceback
+        self.project_name = get_project_name()
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+    def format(self, record):
+        payload = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "project": self.project_name,
+            "message": record.getMessage(),
+        }
+
+        record_dict = record.__dict__
+        for attr, key in self.EXTRA_FIELDS.items():
+            value = record_dict.get(attr)
+            if value is not None:
+                payload[key] = value
+
+        if record.exc_info:
+            if "fingerprint" not in payload:
+                payload["fingerprint"] = get_exception_fingerprint(record.exc_info)
+            if "exception_type" not in payload:
+                payload["exception_type"] = record.exc_info[0].__name__
+            if self.include_traceback:
+                payload["traceback"] = self.formatException(record.exc_info)
+
+        return self._encode(payload)
 
 
 class RequireDebugTrue(logging.Filter):
-    def filter(self, record):
+    def __init__(self, name=""):
         from django.conf import settings
-        return getattr(settings, "ENV", "development") == "development"
+
+        super().__init__(name)
+        self.enabled = getattr(settings, "ENV", "development") == "development"
+
+    def filter(self, record):
+        return self.enabled
 
 
 class RequireDebugFalse(logging.Filter):
+    def __init__(self, name=""):
+        from django.conf import settings
+
+        super().__init__(name)
+        self.enabled = getattr(settings, "ENV", "development") == "production"
+
+    def filter(self, record):
+        return self.enabled
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of records per logger.
+
+    ``rates`` maps logger names to a keep probability (defaults to the
+    ``LOGGING_SAMPLE_RATES`` setting). Records at or above ``always_level`` and
+    the summaries of ``RateLimitFilter`` are never sampled out.
+    """
+
+    def __init__(self, name="", rates=None, always_level=logging.ERROR):
+        from django.conf import settings
+
+        super().__init__(name)
+        self.rates = rates if rates is not None else getattr(settings, "LOGGING_SAMPLE_RATES", {})
+        self.always_level = always_level
+
     def filter(self, record):
+        rate = self.rates.get(record.name, 1.0)
+        if rate >= 1.0 or record.levelno >= self.always_level or getattr(record, "suppressed", 0):
+            return True
+
+        return random.random() < rate
+
+
+_live_rate_limit_filters = weakref.WeakSet()
+_flush_registered = False
+
+
+def _flush_rate_limit_filters():
+    for rate_limit_filter in list(_live_rate_limit_filters):
+        rate_limit_filter.flush()
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket rate limit per message fingerprint.
+
+    Each fingerprint may log ``burst`` records at once and ``rate`` records per
+    second after that. The fingerprint is the record's ``fingerprint`` attribute
+    (set for exceptions) or else its call site, so messages that only differ by
+    path share a bucket. Suppressed records are counted: the next record let
+    through for that fingerprint is suffixed with "(suppressed N similar
+    messages)", and counts still pending after ``summary_interval`` seconds (or
+    at exit) are logged as a separate summary record through the same logger.
+    Arguments left out come from the ``LOGGING_RATE_LIMIT`` setting; with no
+    rate the filter lets everything through. ``burst`` defaults to ``rate`` and
+    is at least 1.
+    """
+
+    def __init__(self, name="", rate=None, burst=None, max_fingerprints=None, summary_interval=None):
+        global _flush_registered
         from django.conf import settings
-        return getattr(settings, "ENV", "development") == "production"
+
+        super().__init__(name)
+        options = getattr(settings, "LOGGING_RATE_LIMIT", None) or {}
+        self.rate = rate if rate is not None else options.get("rate")
+        burst = burst if burst is not None else options.get("burst", self.rate)
+        # A bucket that never holds a whole token would suppress every record.
+        self.burst = max(burst, 1) if burst is not None else None
+        self.max_fingerprints = (
+            max_fingerprints if max_fingerprints is not None else options.get("max_fingerprints", 10000)
+        )
+        self.summary_interval = (
+            summary_interval if summary_interval is not None else options.get("summary_interval", 60)
+        )
+
+        # fingerprint -> [tokens, updated_at, suppressed, first suppressed record]
+        self._buckets = OrderedDict()
+        self._evicted = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+        _live_rate_limit_filters.add(self)
+        if not _flush_registered:
+            # Registered on first use, after the queue handler's exit hook, so it runs before the listener stops.
+            atexit.register(_flush_rate_limit_filters)
+            _flush_registered = True
+
+    def get_fingerprint(self, record):
+        fingerprint = getattr(record, "fingerprint", None)
+        if fingerprint:
+            return (record.name, record.levelno, fingerprint)
+        return (record.name, record.levelno, record.pathname, record.lineno)
+
+    def filter(self, record):
+        if not self.rate or getattr(record, "suppressed", 0):
+            return True
+
+        fingerprint = self.get_fingerprint(record)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(fingerprint)
+            if bucket is None:
+                bucket = self._buckets[fingerprint] = [self.burst, now, 0, None]
+                if len(self._buckets) > self.max_fingerprints:
+                    _evicted_fingerprint, evicted = self._buckets.popitem(last=False)
+                    if evicted[2]:
+                        self._evicted.append((evicted[3], evicted[2]))
+            else:
+                self._buckets.move_to_end(fingerprint)
+
+            tokens, updated_at, suppressed, sample = bucket
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+
+            if tokens < 1:
+                bucket[:] = [tokens, now, suppressed + 1, sample or record]
+                if self._timer is None or not self._timer.is_alive():
+                    self._timer = threading.Timer(self.summary_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return False
+
+            bucket[:] = [tokens - 1, now, 0, None]
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (suppressed {suppressed} similar messages)"
+            record.args = None
+            record.suppressed = suppressed
+
+        return True
+
+    def flush(self):
+        """Log a summary for every fingerprint with suppressed records not reported yet."""
+        with self._lock:
+            pending, self._evicted = self._evicted, []
+            for bucket in self._buckets.values():
+                if bucket[2]:
+                    pending.append((bucket[3], bucket[2]))
+                    bucket[2], bucket[3] = 0, None
+
+        for sample, suppressed in pending:
+            summary = logging.makeLogRecord(
+                dict(
+                    sample.__dict__,
+                    msg=f"{sample.getMessage()} (suppressed {suppressed} similar messages)",
+                    args=None,
+                    exc_info=None,
+                    exc_text=None,
+                    suppressed=suppressed,
+                )
+            )
+            logging.getLogger(sample.name).handle(summary)
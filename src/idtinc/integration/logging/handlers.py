@@ -0,0 +1,121 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+# Handlers that are not closed yet; the process-wide exit and fork hooks act on these only.
+_live_handlers = weakref.WeakSet()
+
+
+def _stop_live_handlers():
+    for handler in list(_live_handlers):
+        # One failing handler must not keep the others from flushing at exit.
+        try:
+            handler.stop()
+        except Exception:
+            pass
+
+
+def _restart_live_handlers_after_fork():
+    for handler in list(_live_handlers):
+        handler._restart_after_fork()
+
+
+atexit.register(_stop_live_handlers)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_live_handlers_after_fork)
+
+
+class QueueStreamHandler(QueueHandler):
+    """Non-blocking stream handler.
+
+    Records are formatted in the calling thread and pushed onto a bounded
+    queue; a ``QueueListener`` thread writes them to ``stream``. When the queue
+    is full the record is discarded according to ``policy`` and counted in
+    ``dropped``.
+    """
+
+    def __init__(self, stream=None, maxsize=10000, policy=DROP_NEWEST):
+        if policy not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"Unknown drop policy: {policy}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.target.setFormatter(logging.Formatter("%(message)s"))
+
+        super().__init__(queue.Queue(maxsize))
+
+        self.listener = None
+        self.start()
+        _live_handlers.add(self)
+
+    def start(self):
+        if self.listener is None:
+            self.listener = QueueListener(self.queue, self.target)
+            self.listener.start()
+
+    def stop(self):
+        listener, self.listener = self.listener, None
+        if listener is None:
+            return
+
+        # QueueListener.stop() enqueues its sentinel with put_nowait(); on a full queue the oldest record makes room.
+        while True:
+            try:
+                listener.stop()
+                break
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    continue
+                with self._dropped_lock:
+                    self.dropped += 1
+
+        if self.dropped:
+            self.target.handle(
+                logging.makeLogRecord({"msg": f"[logging] dropped {self.dropped} records (queue full)"})
+            )
+        self.target.flush()
+
+    def _restart_after_fork(self):
+        # The listener thread does not survive fork (gunicorn --preload), so the
+        # child gets a fresh queue and listener.
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = None
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.start()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.policy == DROP_OLDEST:
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def close(self):
+        _live_handlers.discard(self)
+        self.stop()
+        super().close()
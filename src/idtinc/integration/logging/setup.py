@@ -1,4 +1,27 @@
-def get_setup_logging():
+def _console_handler(formatter, use_queue=False, queue_size=10000, drop_policy="drop_newest", filters=()):
+    handler = {
+        "class": "logging.StreamHandler",
+        "formatter": formatter,
+        "stream": "ext://sys.stdout",
+        "filters": ["require_debug_true", *filters],
+    }
+
+    if use_queue:
+        handler.pop("class")
+        handler["()"] = "idtinc.integration.logging.handlers.QueueStreamHandler"
+        handler["maxsize"] = queue_size
+        handler["policy"] = drop_policy
+
+    return handler
+
+
+def get_setup_logging(use_queue=False, queue_size=10000, drop_policy="drop_newest", use_json=False):
+    queue_options = {"use_queue": use_queue, "queue_size": queue_size, "drop_policy": drop_policy}
+    throttle_filters = ["sampling", "rate_limit"]
+
+    def formatter(name):
+        return "json" if use_json else name
+
     return {
         "version": 1,
         "disable_existing_loggers": False,
@@ -18,6 +41,9 @@ def get_setup_logging():
             "exception": {
                 "()": "idtinc.integration.logging.formatters.ExceptionLogFormatter",
             },
+            "json": {
+                "()": "idtinc.integration.logging.formatters.JsonLogFormatter",
+            },
         },
         "filters": {
             "require_debug_false": {
@@ -26,38 +52,19 @@ def get_setup_logging():
             "require_debug_true": {
                 "()": "idtinc.integration.logging.formatters.RequireDebugTrue",
             },
+            "sampling": {
+                "()": "idtinc.integration.logging.formatters.SamplingFilter",
+            },
+            "rate_limit": {
+                "()": "idtinc.integration.logging.formatters.RateLimitFilter",
+            },
         },
         "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "formatter": "colored",
-                "stream": "ext://sys.stdout",
-                "filters": ["require_debug_true"],
-            },
-            "server_console": {
-                "class": "logging.StreamHandler",
-                "formatter": "server",
-                "stream": "ext://sys.stdout",
-                "filters": ["require_debug_true"],
-            },
-            "request_console": {
-                "class": "logging.StreamHandler",
-                "formatter": "request",
-                "stream": "ext://sys.stdout",
-                "filters": ["require_debug_true"],
-            },
-            "response_console": {
-                "class": "logging.StreamHandler",
-                "formatter": "response",
-                "stream": "ext://sys.stdout",
-                "filters": ["require_debug_true"],
-            },
-            "exception_console": {
-                "class": "logging.StreamHandler",
-                "formatter": "exception",
-                "stream": "ext://sys.stdout",
-                "filters": ["require_debug_true"],
-            },
+            "console": _console_handler(formatter("colored"), **queue_options),
+            "server_console": _console_handler(formatter("server"), **queue_options),
+            "request_console": _console_handler(formatter("request"), filters=throttle_filters, **queue_options),
+            "response_console": _console_handler(formatter("response"), filters=throttle_filters, **queue_options),
+            "exception_console": _console_handler(formatter("exception"), filters=throttle_filters, **queue_options),
         },
         "loggers": {
             "django": {
@@ -0,0 +1,124 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.utils.module_loading import import_string
+
+# Names per ``__in`` lookup, below SQLite's default limit of 999 query parameters.
+LOOKUP_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Delete bucket objects that are not referenced by any FileField."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--storage", default=None, help="Import path of the storage class (defaults to default_storage).")
+        parser.add_argument("--prefix", default="", help="Only scan objects under this prefix.")
+        parser.add_argument("--older-than", type=float, default=24, help="Only delete objects older than this many hours.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Objects per delete_many call.")
+        parser.add_argument("--workers", type=int, default=4, help="Delete batches in parallel.")
+        parser.add_argument("--progress-every", type=int, default=10000, help="Report progress every N scanned objects.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report orphaned objects.")
+
+    def get_storage(self, path):
+        if not path:
+            return default_storage
+        return import_string(path)()
+
+    def get_file_fields(self):
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField):
+                    yield model, field
+
+    def get_referenced_names(self):
+        referenced = set()
+
+        for model, field in self.get_file_fields():
+            queryset = (
+                model._base_manager.exclude(**{f"{field.attname}__isnull": True})
+                .exclude(**{field.attname: ""})
+                .values_list(field.attname, flat=True)
+            )
+            referenced.update(queryset.iterator(chunk_size=5000))
+
+        return referenced
+
+    def drop_referenced(self, batch):
+        """Re-check ``batch`` right before deleting it.
+
+        Content-addressed objects are shared: a row saved after the initial scan
+        may point at an existing object without uploading anything.
+        """
+        referenced = set()
+        for model, field in self.get_file_fields():
+            for start in range(0, len(batch), LOOKUP_CHUNK_SIZE):
+                chunk = batch[start : start + LOOKUP_CHUNK_SIZE]
+                referenced.update(
+                    model._base_manager.filter(**{f"{field.attname}__in": chunk}).values_list(field.attname, flat=True)
+                )
+        return [name for name in batch if name not in referenced]
+
+    def handle(self, *args, **options):
+        storage = self.get_storage(options["storage"])
+        if not hasattr(storage, "iter_objects") or not hasattr(storage, "delete_many"):
+            raise CommandError(f"{type(storage).__name__} does not support iter_objects/delete_many.")
+
+        referenced = self.get_referenced_names()
+        self.stdout.write(f"{len(referenced)} file references found")
+
+        # Backends report aware UTC times, whatever USE_TZ is.
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=options["older_than"])
+        dry_run = options["dry_run"]
+        batch_size = options["batch_size"]
+
+        scanned = orphaned = deleted = failed = 0
+        batch, pending = [], deque()
+
+        def delete_batch(batch):
+            if dry_run:
+                return len(batch), []
+            return len(batch), storage.delete_many(batch)
+
+        def collect(future):
+            nonlocal deleted, failed
+            count, errors = future.result()
+            deleted += count - len(errors)
+            failed += len(errors)
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for name, modified in storage.iter_objects(prefix=options["prefix"]):
+                scanned += 1
+
+                if name not in referenced and (modified is None or modified < cutoff):
+                    orphaned += 1
+                    batch.append(name)
+                    if options["verbosity"] >= 2:
+                        self.stdout.write(f"orphan: {name}")
+
+                if len(batch) >= batch_size:
+                    pending.append(executor.submit(delete_batch, self.drop_referenced(batch)))
+                    batch = []
+                    while len(pending) > options["workers"] * 2:
+                        collect(pending.popleft())
+
+                if scanned % options["progress_every"] == 0:
+                    action = "would delete" if dry_run else "deleted"
+                    self.stdout.write(f"scanned {scanned}, orphaned {orphaned}, {action} {deleted}")
+
+            if batch:
+                pending.append(executor.submit(delete_batch, self.drop_referenced(batch)))
+
+            while pending:
+                collect(pending.popleft())
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run: scanned {scanned}, {orphaned} orphaned objects"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Scanned {scanned}, deleted {deleted} orphaned objects, {failed} failed")
+            )
@@ -0,0 +1,54 @@
+import io
+
+from django.core.management.base import BaseCommand
+
+from idtinc.integration.profiling import ProfileStore, sign_profile_token
+
+
+class Command(BaseCommand):
+    help = "List the slowest profiled requests and aggregate their hottest functions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=10, help="Number of slowest requests to list.")
+        parser.add_argument("--top", type=int, default=25, help="Number of hottest functions to print.")
+        parser.add_argument("--path", default=None, help="Only include requests whose path starts with this prefix.")
+        parser.add_argument(
+            "--sort",
+            default="tottime",
+            choices=["tottime", "cumulative", "ncalls"],
+            help="Sort key used for the aggregated functions.",
+        )
+        parser.add_argument("--directory", default=None, help="Profile directory (defaults to PROFILER_DIRECTORY).")
+        parser.add_argument("--sign", action="store_true", help="Print a signed X-Profile header value and exit.")
+
+    def handle(self, *args, **options):
+        if options["sign"]:
+            self.stdout.write(sign_profile_token())
+            return
+
+        store = ProfileStore(directory=options["directory"])
+        entries = store.slowest(limit=None)
+
+        if options["path"]:
+            entries = [e for e in entries if str(e.get("path", "")).startswith(options["path"])]
+
+        entries = entries[: options["limit"]]
+
+        if not entries:
+            self.stdout.write(f"No profiles found in {store.directory}")
+            return
+
+        self.stdout.write(f"{'duration(ms)':>12}  {'status':>6}  {'method':<7} {'action':<20} path")
+        for entry in entries:
+            self.stdout.write(
+                f"{entry.get('duration_ms', 0):>12.1f}  {str(entry.get('status')):>6}  "
+                f"{entry.get('method', ''):<7} {str(entry.get('action') or '-'):<20} {entry.get('path', '')}"
+            )
+
+        output = io.StringIO()
+        stats = store.aggregate([e["id"] for e in entries], stream=output)
+        if stats is None:
+            return
+
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
+        self.stdout.write(output.getvalue())
@@ -0,0 +1,37 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = "Requeue write-behind uploads left in the spool journal and wait for them to finish."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--storage", default=None, help="Import path of the storage class (defaults to default_storage).")
+        parser.add_argument("--timeout", type=float, default=None, help="Give up waiting after this many seconds.")
+
+    def get_storage(self, path):
+        if not path:
+            return default_storage
+        return import_string(path)()
+
+    def handle(self, *args, **options):
+        storage = self.get_storage(options["storage"])
+        if not hasattr(storage, "recover") or not hasattr(storage, "pending"):
+            raise CommandError(f"{type(storage).__name__} is not a write-behind storage.")
+
+        # Instantiating the storage already requeued the journal.
+        pending = storage.pending()
+        self.stdout.write(f"{len(pending)} pending uploads in {storage.directory}")
+
+        if not storage.flush(timeout=options["timeout"]):
+            self.stdout.write(self.style.WARNING(f"Timed out, {len(storage.pending())} uploads still pending"))
+            return
+
+        remaining = storage.pending()
+        if remaining:
+            self.stdout.write(self.style.WARNING(f"{len(remaining)} uploads failed and stay in the journal"))
+            for name in remaining:
+                self.stdout.write(f"pending: {name}")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Uploaded {len(pending)} pending files"))
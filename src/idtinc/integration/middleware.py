@@ -1,4 +1,10 @@
+import cProfile
+import itertools
 import logging
+import re
+import threading
+import time
+from functools import lru_cache
 
 from django.shortcuts import redirect
 from django.utils import translation
@@ -7,7 +13,9 @@ from django.utils.deprecation import MiddlewareMixin
 from idtinc.core.message import Msg
 from idtinc.core.status import HttpStatus
 
+from .profiling import DEFAULT_PROFILE_TOKEN_MAX_AGE, ProfileStore, is_valid_profile_token
 from .response import JsonAPIResponse
+from .storage.metrics import server_timing, start_request_timings, stop_request_timings
 
 request_logger = logging.getLogger("request")
 response_logger = logging.getLogger("response")
@@ -27,25 +35,52 @@ class ExceptionMiddleware(MiddlewareMixin):
         "/redoc",
     ]
 
-    def should_log_request(self, request):
-        path = request.path.rstrip("/")
-        excluded_paths = [p.rstrip("/") for p in self.EXCLUDED_PATHS]
+    def __init__(self, get_response=None):
+        from django.conf import settings
 
-        if path in excluded_paths:
-            return False
+        self.excluded_paths_pattern = self.compile_excluded_paths(self.EXCLUDED_PATHS)
+        self.log_requests = settings.DEBUG and request_logger.isEnabledFor(logging.INFO)
+        self.log_warnings = response_logger.isEnabledFor(logging.WARNING)
+        self.log_errors = response_logger.isEnabledFor(logging.ERROR)
+
+        super().__init__(get_response)
+
+    @staticmethod
+    def compile_excluded_paths(excluded_paths):
+        exact_paths = [re.escape(p.rstrip("/")) + "$" for p in excluded_paths]
+        prefix_paths = [re.escape(p.rstrip("/")) for p in excluded_paths if p.endswith("/")]
+        return re.compile("|".join(prefix_paths + exact_paths) or "(?!)")
+
+    def should_log_request(self, request):
+        should_log = getattr(request, "_should_log_request", None)
 
-        for excluded_path in self.EXCLUDED_PATHS:
-            if excluded_path.endswith("/") and path.startswith(excluded_path.rstrip("/")):
-                return False
+        if should_log is None:
+            should_log = not self.excluded_paths_pattern.match(request.path.rstrip("/"))
+            request._should_log_request = should_log
 
-        return True
+        return should_log
 
     def process_request(self, request):
-        from django.conf import settings
-        if self.should_log_request(request) and settings.DEBUG:
+        request._started_at = time.perf_counter()
+
+        if self.log_requests and self.should_log_request(request):
             request_logger.info(f"{request.path} [{request.method}]")
         return None
 
+    def get_log_extra(self, request, status_code):
+        started_at = getattr(request, "_started_at", None)
+        storage_timings = getattr(request, "_storage_timings", None)
+
+        return {
+            "request_path": request.path,
+            "request_method": request.method,
+            "status_code": status_code,
+            "latency_ms": round((time.perf_counter() - started_at) * 1000, 3) if started_at else None,
+            "storage_ms": (
+                round(sum(seconds for _, seconds in storage_timings.values()) * 1000, 3) if storage_timings else None
+            ),
+        }
+
     def process_response(self, request, response):
         response_data = getattr(response, "data", {}) or {}
         status_code = getattr(response, "status_code", HttpStatus.INTERNAL_SERVER_ERROR.value)
@@ -60,15 +95,21 @@ class ExceptionMiddleware(MiddlewareMixin):
             return response
 
         if response.status_code == HttpStatus.NOT_FOUND.value:
-            if self.should_log_request(request):
-                response_logger.warning(f"{request.path} [{HttpStatus.NOT_FOUND}]")
+            if self.log_warnings:
+                response_logger.warning(
+                    f"{request.path} [{HttpStatus.NOT_FOUND}]",
+                    extra=self.get_log_extra(request, HttpStatus.NOT_FOUND.value),
+                )
             return JsonAPIResponse(status=HttpStatus.NOT_FOUND, message=Msg.NOT_FOUND)
 
         if HttpStatus.is_server_error(response.status_code):
-            if self.should_log_request(request):
-                response_logger.error(f"InternalServerError {status_code}: Internal Server Error")
-        elif self.should_log_request(request):
-            response_logger.warning(f"{request.path} [{status_code}]")
+            if self.log_errors:
+                response_logger.error(
+                    f"InternalServerError {status_code}: Internal Server Error",
+                    extra=self.get_log_extra(request, status_code),
+                )
+        elif self.log_warnings:
+            response_logger.warning(f"{request.path} [{status_code}]", extra=self.get_log_extra(request, status_code))
 
         return response
 
@@ -80,37 +121,90 @@ class CustomLocaleMiddleware(MiddlewareMixin):
 
         self.ALLOWED_LANGUAGES = [l[0] for l in getattr(settings, "LANGUAGES", [])]
         self.DEFAULT_LANGUAGE = getattr(settings, "LANGUAGE_CODE", "vi")
-        
+
+        self._languages = {l.lower(): l for l in self.ALLOWED_LANGUAGES}
+        self.resolve_language = lru_cache(maxsize=getattr(settings, "LOCALE_CACHE_SIZE", 512))(
+            self._resolve_language
+        )
+
         super().__init__(get_response)
 
     def is_valid_language(self, lang):
         return lang in self.ALLOWED_LANGUAGES
 
-    def get_language_from_request(self, request):
-        lang_param = request.GET.get("lang")
-        if lang_param and self.is_valid_language(lang_param):
-            return lang_param
-
-        accept_language = request.META.get("HTTP_ACCEPT_LANGUAGE", "")
-        if accept_language and self.is_valid_language(accept_language):
-            return accept_language
+    def match_language(self, lang):
+        lang = lang.strip().lower().replace("_", "-")
+        if lang in self._languages:
+            return self._languages[lang]
+
+        return self._languages.get(lang.split("-")[0])
+
+    @staticmethod
+    def _parse_accept_language(header):
+        """Accepted language ranges ordered by q-value (``*`` included), and the ranges refused with q=0."""
+        languages = []
+        rejected = []
+
+        for index, part in enumerate(header.split(",")):
+            lang, _, params = part.partition(";")
+            lang = lang.strip()
+            if not lang:
+                continue
+
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        quality = min(float(value), 1.0)
+                    except ValueError:
+                        quality = 0.0
+
+            if quality > 0:
+                languages.append((-quality, index, lang))
+            else:
+                rejected.append(lang)
+
+        return [lang for _, _, lang in sorted(languages)], rejected
+
+    @classmethod
+    def parse_accept_language(cls, header):
+        return [lang for lang in cls._parse_accept_language(header)[0] if lang != "*"]
+
+    def _resolve_language(self, lang_param, accept_language):
+        if lang_param:
+            language = self.match_language(lang_param)
+            if language:
+                return language
+
+        languages, rejected = self._parse_accept_language(accept_language)
+        for lang in languages:
+            if lang == "*":
+                # Any language not listed: the default, unless the client refused it.
+                refused = {self._languages.get(l.lower().replace("_", "-")) for l in rejected}
+                for language in (self.DEFAULT_LANGUAGE, *self.ALLOWED_LANGUAGES):
+                    if language not in refused:
+                        return language
+                continue
+
+            language = self.match_language(lang)
+            if language:
+                return language
 
         return self.DEFAULT_LANGUAGE
 
+    def get_language_from_request(self, request):
+        return self.resolve_language(request.GET.get("lang"), request.META.get("HTTP_ACCEPT_LANGUAGE", ""))
+
     def process_request(self, request):
         language = self.get_language_from_request(request)
 
-        if not self.is_valid_language(language):
-            language = self.DEFAULT_LANGUAGE
-
-        translation.activate(language)
+        if translation.get_language() != language:
+            translation.activate(language)
 
         request.LANGUAGE_CODE = language
         request.META["HTTP_ACCEPT_LANGUAGE"] = language
 
-        if request.path.startswith("/swagger"):
-            request.META["HTTP_ACCEPT_LANGUAGE"] = language
-
         return None
 
     def process_response(self, request, response):
@@ -118,3 +212,123 @@ class CustomLocaleMiddleware(MiddlewareMixin):
             response["Content-Language"] = request.LANGUAGE_CODE
 
         return response
+
+
+class ProfilerMiddleware(MiddlewareMixin):
+    """Profile 1 in ``PROFILER_SAMPLE_RATE`` requests, or requests carrying a
+    valid signed ``X-Profile`` header, and store them in a ``ProfileStore``.
+
+    Only one request is profiled at a time per process; concurrent candidates
+    are skipped instead of waiting.
+    """
+
+    HEADER = "HTTP_X_PROFILE"
+
+    def __init__(self, get_response=None):
+        from django.conf import settings
+
+        self.enabled = getattr(settings, "PROFILER_ENABLED", False)
+        self.sample_rate = int(getattr(settings, "PROFILER_SAMPLE_RATE", 0) or 0)
+        self.token_max_age = getattr(settings, "PROFILER_TOKEN_MAX_AGE", DEFAULT_PROFILE_TOKEN_MAX_AGE)
+        self.store = ProfileStore(max_profiles=getattr(settings, "PROFILER_MAX_PROFILES", 200))
+
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+        super().__init__(get_response)
+
+    def should_profile(self, request):
+        if not self.enabled:
+            return False
+
+        token = request.META.get(self.HEADER)
+        if token and is_valid_profile_token(token, max_age=self.token_max_age):
+            return True
+
+        return self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+
+    def process_request(self, request):
+        if not self.should_profile(request) or not self._lock.acquire(blocking=False):
+            return None
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            self._lock.release()
+            return None
+
+        request._profiler = profiler
+        request._profiler_started_at = time.perf_counter()
+        return None
+
+    def process_response(self, request, response):
+        profiler = getattr(request, "_profiler", None)
+        if profiler is None:
+            return response
+
+        try:
+            profiler.disable()
+            duration_ms = (time.perf_counter() - request._profiler_started_at) * 1000
+        finally:
+            del request._profiler
+            self._lock.release()
+
+        self.store.save(
+            profiler,
+            {
+                "path": request.path,
+                "method": request.method,
+                "action": self.get_action(request),
+                "status": getattr(response, "status_code", None),
+                "duration_ms": round(duration_ms, 3),
+                "created_at": time.time(),
+            },
+        )
+
+        return response
+
+    def get_action(self, request):
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None:
+            return None
+
+        actions = getattr(resolver_match.func, "actions", None)
+        if actions:
+            return actions.get(request.method.lower())
+
+        return resolver_match.view_name
+
+
+class StorageTimingMiddleware(MiddlewareMixin):
+    """Report the time each request spent in storage backends in a ``Server-Timing`` header.
+
+    Adds one entry per backend and operation (e.g. ``storage-minio-open``).
+    Enabled by ``STORAGE_SERVER_TIMING``, which defaults to ``DEBUG`` since the
+    header tells clients which backends a request touched.
+    """
+
+    def __init__(self, get_response=None):
+        from django.conf import settings
+
+        self.enabled = getattr(settings, "STORAGE_SERVER_TIMING", settings.DEBUG)
+
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        if self.enabled:
+            request._storage_timings, request._storage_timings_token = start_request_timings()
+        return None
+
+    def process_response(self, request, response):
+        timings = getattr(request, "_storage_timings", None)
+        if timings is None:
+            return response
+
+        stop_request_timings(request._storage_timings_token)
+        if timings:
+            value = server_timing(timings)
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = f"{existing}, {value}" if existing else value
+
+        return response
@@ -0,0 +1,99 @@
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from django.core import signing
+
+PROFILE_SIGNING_SALT = "idtinc.integration.profiling"
+DEFAULT_PROFILE_TOKEN_MAX_AGE = 3600
+
+
+def sign_profile_token() -> str:
+    return signing.dumps("profile", salt=PROFILE_SIGNING_SALT)
+
+
+def is_valid_profile_token(token: str, max_age: Optional[int] = DEFAULT_PROFILE_TOKEN_MAX_AGE) -> bool:
+    try:
+        return signing.loads(token, salt=PROFILE_SIGNING_SALT, max_age=max_age) == "profile"
+    except signing.BadSignature:
+        return False
+
+
+class ProfileStore:
+    """Bounded on-disk ring of request profiles.
+
+    Each profile is a ``.prof`` file (``pstats`` format) with a ``.json`` sidecar
+    holding the request path, method, action, status and duration. The oldest
+    profiles are removed once ``max_profiles`` is exceeded.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_profiles: int = 200):
+        from django.conf import settings
+
+        self.directory = directory or getattr(
+            settings,
+            "PROFILER_DIRECTORY",
+            os.path.join(tempfile.gettempdir(), "idtinc-profiles"),
+        )
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, profiler, metadata: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        base_path = os.path.join(self.directory, profile_id)
+
+        profiler.dump_stats(f"{base_path}.prof")
+        with open(f"{base_path}.json", "w") as f:
+            json.dump({"id": profile_id, **metadata}, f)
+
+        self.prune()
+        return profile_id
+
+    def prune(self) -> None:
+        with self._lock:
+            profile_ids = sorted(self._profile_ids())
+            for profile_id in profile_ids[: max(len(profile_ids) - self.max_profiles, 0)]:
+                for ext in (".prof", ".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, profile_id + ext))
+                    except FileNotFoundError:
+                        pass
+
+    def _profile_ids(self) -> List[str]:
+        try:
+            filenames = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        return [name[: -len(".prof")] for name in filenames if name.endswith(".prof")]
+
+    def entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for profile_id in self._profile_ids():
+            try:
+                with open(os.path.join(self.directory, f"{profile_id}.json")) as f:
+                    entries.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+
+        return entries
+
+    def slowest(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        return sorted(self.entries(), key=lambda e: e.get("duration_ms", 0), reverse=True)[:limit]
+
+    def profile_path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.prof")
+
+    def aggregate(self, profile_ids: List[str], stream=None) -> Optional[pstats.Stats]:
+        paths = [p for p in map(self.profile_path, profile_ids) if os.path.exists(p)]
+        if not paths:
+            return None
+
+        return pstats.Stats(*paths, stream=stream)
@@ -1,12 +1,20 @@
+import copy
 import json
 import re
 
+from django.core.files.storage import default_storage
+from django.db import models
 from django_currentuser.middleware import get_current_user
 from rest_framework import exceptions, serializers
 
 from .helpers.query import (get_choice_value, get_choices_dict,
                             get_choices_label, get_choices_value,
-                            get_storage_url)
+                            get_storage_url, get_storage_urls)
+
+try:
+    from rest_framework.serializers import LIST_SERIALIZER_KWARGS_REMOVE
+except ImportError:  # djangorestframework < 3.15
+    LIST_SERIALIZER_KWARGS_REMOVE = ("allow_empty", "min_length", "max_length")
 
 
 class ChoiceField(serializers.ChoiceField):
@@ -69,7 +77,81 @@ class CoordinatesField(serializers.CharField):
         return value
 
 
+class StorageURLField(serializers.Field):
+    """Read-only URL of a stored file (``FileField`` value or object name).
+
+    Under a ``many=True`` ``BaseModelSerializer`` the URLs of the whole page are
+    resolved up front with one ``storage.urls()`` call.
+    """
+
+    def __init__(self, storage=None, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.storage = storage
+        self._urls = {}
+
+    def __deepcopy__(self, memo):
+        # Storages hold locks and connection pools; share the instance instead of copying it.
+        kwargs = {key: copy.deepcopy(value, memo) for key, value in self._kwargs.items() if key != "storage"}
+        return self.__class__(*copy.deepcopy(self._args, memo), storage=self.storage, **kwargs)
+
+    def get_storage(self):
+        return self.storage or default_storage
+
+    def prefetch(self, names):
+        names = [name for name in dict.fromkeys(names) if name and name not in self._urls]
+        if names:
+            self._urls.update(zip(names, get_storage_urls(names, self.get_storage())))
+
+    def to_representation(self, value):
+        name = getattr(value, "name", value)
+        if not name:
+            return None
+
+        url = self._urls.get(name)
+        if url is None:
+            url = self.get_storage().url(name)
+        return url
+
+
+class BaseListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.prefetch_storage_urls(items)
+        return super().to_representation(items)
+
+    def prefetch_storage_urls(self, items):
+        for field in self.child._readable_fields:
+            if not isinstance(field, StorageURLField):
+                continue
+
+            names = []
+            for item in items:
+                try:
+                    value = field.get_attribute(item)
+                except (AttributeError, KeyError, serializers.SkipField):
+                    continue
+                names.append(getattr(value, "name", value))
+
+            field.prefetch(names)
+
+
 class BaseModelSerializer(serializers.ModelSerializer):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        # Meta is often shared or inherited, so BaseListSerializer is used without setting it there.
+        if hasattr(getattr(cls, "Meta", None), "list_serializer_class"):
+            return super().many_init(*args, **kwargs)
+
+        list_kwargs = {}
+        for key in LIST_SERIALIZER_KWARGS_REMOVE:
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update({key: value for key, value in kwargs.items() if key in serializers.LIST_SERIALIZER_KWARGS})
+        return BaseListSerializer(*args, **list_kwargs)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -1,5 +1,7 @@
 from .backblaze import BackblazeStorage
+from .cached import CachedStorage
 from .minio import MinioStorage
 from .staticfiles import StaticFilesStorage
+from .writebehind import WriteBehindStorage
 
-__all__ = ["MinioStorage", "BackblazeStorage", "StaticFilesStorage"]
+__all__ = ["MinioStorage", "BackblazeStorage", "StaticFilesStorage", "CachedStorage", "WriteBehindStorage"]
@@ -0,0 +1,177 @@
+import asyncio
+import io
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from .files import DEFAULT_READ_BUFFER_SIZE
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_ASYNC_POOL_SIZE = 10
+ASYNC_TIMEOUT = 300
+ASYNC_CONNECT_TIMEOUT = 10
+
+# httpx clients hold connections bound to the loop that opened them, so each loop gets its own.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client(pool_size: int = DEFAULT_ASYNC_POOL_SIZE) -> "httpx.AsyncClient":
+    """Keep-alive ``httpx.AsyncClient`` of the running event loop with ``pool_size`` connections per host."""
+    if httpx is None:
+        raise RuntimeError(
+            "The async storage API requires 'httpx'. "
+            "Install with: pip install idtinc[async]"
+        )
+
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(pool_size)
+    if client is None or client.is_closed:
+        client = clients[pool_size] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(ASYNC_TIMEOUT, connect=ASYNC_CONNECT_TIMEOUT),
+        )
+    return client
+
+
+async def close_async_clients() -> None:
+    """Close the clients of the running event loop (e.g. on ASGI lifespan shutdown)."""
+    for client in _clients.pop(asyncio.get_running_loop(), {}).values():
+        await client.aclose()
+
+
+class SingleFlight:
+    """Coalesces concurrent awaits of the same key on an event loop into one call of ``factory()``."""
+
+    def __init__(self):
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+    async def run(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda _task: tasks.pop(key, None))
+        # A cancelled waiter must not cancel the call the others are waiting on.
+        return await asyncio.shield(task)
+
+
+class AsyncRemoteFile:
+    """Async counterpart of ``RemoteFile``.
+
+    ``open_range(offset)`` must be a coroutine returning a streaming
+    ``httpx.Response`` positioned at ``offset``. The response is opened on the
+    first read and reopened only when a seek moves the position, so memory use
+    is bounded by ``chunk_size`` whatever the object size. ``on_read(n)``, if
+    given, is called with the size of every chunk received.
+    """
+
+    mode = "rb"
+
+    def __init__(
+        self,
+        open_range: Callable[[int], Awaitable[Any]],
+        name: str,
+        size: int,
+        chunk_size: Optional[int] = None,
+        on_read: Optional[Callable[[int], None]] = None,
+    ):
+        self.name = name
+        self.size = size
+        self.chunk_size = chunk_size or DEFAULT_READ_BUFFER_SIZE
+        self._open_range = open_range
+        self._on_read = on_read
+        self._position = 0
+        self._buffer = b""
+        self._response = None
+        self._stream = None
+        self._stale = []
+        self.closed = False
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        if position != self._position:
+            # Responses cannot be closed synchronously; the next read closes them.
+            if self._response is not None:
+                self._stale.append(self._response)
+            self._response, self._stream, self._buffer = None, None, b""
+            self._position = position
+
+        return self._position
+
+    async def _next_chunk(self) -> bytes:
+        while self._stale:
+            await self._stale.pop().aclose()
+
+        if self._stream is None:
+            self._response = await self._open_range(self._position)
+            self._stream = self._response.aiter_raw(self.chunk_size)
+
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+        if self._on_read is not None:
+            self._on_read(len(chunk))
+        return chunk
+
+    async def read(self, size: int = -1) -> bytes:
+        remaining = self.size - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+
+        parts = []
+        while size > 0:
+            if not self._buffer:
+                self._buffer = await self._next_chunk()
+                if not self._buffer:
+                    break
+
+            part, self._buffer = self._buffer[:size], self._buffer[size:]
+            parts.append(part)
+            size -= len(part)
+            self._position += len(part)
+
+        return b"".join(parts)
+
+    async def chunks(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        self.seek(0)
+        while True:
+            data = await self.read(chunk_size or self.chunk_size)
+            if not data:
+                return
+            yield data
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self.chunks()
+
+    async def close(self) -> None:
+        if self._response is not None:
+            self._stale.append(self._response)
+        self._response, self._stream, self._buffer = None, None, b""
+        while self._stale:
+            await self._stale.pop().aclose()
+        self.closed = True
+
+    async def __aenter__(self) -> "AsyncRemoteFile":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,18 +1,253 @@
+import asyncio
 import base64
+import functools
+import hashlib
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
 import urllib.parse
-from io import BytesIO
+import weakref
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 from tempfile import TemporaryFile
 
 import requests
-from django.core.files.base import File
 from django.core.files.storage import Storage
 from django.utils.deconstruct import deconstructible
+from requests.adapters import HTTPAdapter
+
+from .aio import AsyncRemoteFile, SingleFlight, get_async_client, httpx
+from .cache import TTLCache, resolve_many, signed_url_ttl
+from .files import (DEFAULT_READ_BUFFER_SIZE, RangeReader, RemoteFile, content_addressed_name, hash_content,
+                    is_content_addressed_name, quote_name)
+from .metrics import instrumented, record_bytes, record_retry
+
+DEFAULT_URL_EXPIRES = 3600
+DEFAULT_DELETE_WORKERS = 8
+DEFAULT_POOL_SIZE = 10
+DEFAULT_UPLOAD_CONCURRENCY = 8
+AUTH_TOKEN_TTL = 24 * 3600
+AUTH_REFRESH_MARGIN = 3600
+UPLOAD_RETRY_STATUSES = (401, 408, 429, 500, 503)
+UPLOAD_ATTEMPTS = 5
+API_ATTEMPTS = 5
+DEFAULT_LARGE_FILE_THRESHOLD = 200 * 1024 * 1024
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+DEFAULT_PART_WORKERS = 4
+MIN_PART_SIZE = 5 * 1000 * 1000
+MAX_PARTS = 10000
+SPOOL_MAX_MEMORY = 10 * 1024 * 1024
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 16
+DEFAULT_METADATA_TTL = 60
+DEFAULT_METADATA_NEGATIVE_TTL = 10
+
+_MISSING = object()
+
+# Account authorizations shared by every instance in the process; entries expire
+# an hour before B2 invalidates the token so it is refreshed before the first 401.
+_authorizations = TTLCache(maxsize=100, ttl=AUTH_TOKEN_TTL - AUTH_REFRESH_MARGIN)
+_async_authorizations = SingleFlight()
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def backoff_delay(attempt, response=None):
+    """Seconds to wait before retry ``attempt`` (0-based): full-jitter exponential backoff.
+
+    A ``Retry-After`` header on ``response`` takes precedence.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), RETRY_BACKOFF_MAX)
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+
+
+def is_retryable(status):
+    """Whether a B2 response with ``status`` is worth retrying: request timeouts, throttling and server errors."""
+    return status in (408, 429) or status >= 500
+
+
+class Sha1TrailingReader:
+    """Upload body that streams ``file_obj`` and appends its hex SHA1.
+
+    Used with ``X-Bz-Content-Sha1: hex_digits_at_end`` so the file is read
+    once while it is sent. ``rewind()`` restarts the body for a retry.
+    """
+
+    def __init__(self, file_obj, size):
+        self._file = file_obj
+        self._size = size
+        self.rewind()
+
+    def rewind(self):
+        self._file.seek(0)
+        self._sha1 = hashlib.sha1()
+        self._remaining = self._size
+        self._trailer = None
+
+    def __len__(self):
+        return self._size + 40
+
+    def read(self, n=-1):
+        if self._remaining > 0:
+            data = self._file.read(self._remaining if n is None or n < 0 else min(n, self._remaining))
+            if data:
+                self._remaining -= len(data)
+                self._sha1.update(data)
+                return data
+            self._remaining = 0
+
+        if self._trailer is None:
+            self._trailer = self._sha1.hexdigest().encode("ascii")
+
+        data = self._trailer if n is None or n < 0 else self._trailer[:n]
+        self._trailer = self._trailer[len(data):]
+        return data
+
+
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """Process-wide keep-alive ``requests.Session`` with ``pool_size`` connections per host."""
+    key = (os.getpid(), pool_size)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[key] = session
+    return session
+
+
+class UploadUrlPool:
+    """Thread-safe pool of B2 upload URL/token pairs.
+
+    B2 accepts one upload at a time per upload URL. Each upload checks a pair
+    out with ``acquire()``, then ``release()``s it on success or ``discard()``s
+    it when B2 rejects it. New pairs are fetched on demand until
+    ``max_size`` exist; beyond that callers wait for one to come back.
+    """
+
+    def __init__(self, fetch, max_size=DEFAULT_UPLOAD_CONCURRENCY):
+        self._fetch = fetch
+        self.max_size = max_size
+        self._idle = []
+        self._size = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+
+        try:
+            return self._fetch()
+        except BaseException:
+            self._forget()
+            raise
+
+    def release(self, upload):
+        with self._condition:
+            self._idle.append(upload)
+            self._condition.notify()
+
+    def discard(self, upload):
+        self._forget()
+
+    def clear(self):
+        with self._condition:
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+    def _forget(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def __len__(self):
+        return self._size
+
+
+class AsyncUploadUrlPool:
+    """``UploadUrlPool`` for coroutines: ``fetch`` is a coroutine function and callers wait without blocking the loop.
+
+    A pool belongs to the event loop it is first used in.
+    """
+
+    def __init__(self, fetch, max_size=DEFAULT_UPLOAD_CONCURRENCY):
+        self._fetch = fetch
+        self.max_size = max_size
+        self._idle = []
+        self._size = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                await self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+
+        try:
+            return await self._fetch()
+        except BaseException:
+            await self._forget()
+            raise
+
+    async def release(self, upload):
+        async with self._condition:
+            self._idle.append(upload)
+            self._condition.notify()
+
+    async def discard(self, upload):
+        await self._forget()
+
+    async def _forget(self):
+        async with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def __len__(self):
+        return self._size
 
 
 @deconstructible
 class BackblazeStorage(Storage):
+    authorize_url = "https://api.backblaze.com/b2api/v2/b2_authorize_account"
+    metrics_backend = "backblaze"
 
-    def __init__(self, app_key=None, account_id=None, bucket_name=None, bucket_id=None):
+    def __init__(
+        self,
+        app_key=None,
+        account_id=None,
+        bucket_name=None,
+        bucket_id=None,
+        signed_urls=None,
+        url_expires=None,
+        delete_workers=None,
+        content_addressed=None,
+        content_prefix=None,
+        pool_size=None,
+        upload_concurrency=None,
+        large_file_threshold=None,
+        part_size=None,
+        part_workers=None,
+        read_buffer_size=None,
+        metadata_ttl=None,
+        metadata_negative_ttl=None,
+    ):
         from django.conf import settings
 
         self.app_key = app_key or getattr(settings, "STORAGE_BACKBLAZE_APP_KEY", None)
@@ -25,117 +260,780 @@ class BackblazeStorage(Storage):
         self.bucket_id = bucket_id or getattr(
             settings, "STORAGE_BACKBLAZE_BUCKET_ID", None
         )
-        self.download_url = ""
-        self.base_url = ""
-        
-        self.backblaze_authorize()
+        self.signed_urls = (
+            signed_urls if signed_urls is not None else getattr(settings, "STORAGE_BACKBLAZE_SIGNED_URLS", False)
+        )
+        self.url_expires = url_expires or getattr(settings, "STORAGE_BACKBLAZE_URL_EXPIRES", DEFAULT_URL_EXPIRES)
+        self._signed_urls = TTLCache(ttl=signed_url_ttl(self.url_expires))
+        self.delete_workers = delete_workers or getattr(
+            settings, "STORAGE_BACKBLAZE_DELETE_WORKERS", DEFAULT_DELETE_WORKERS
+        )
+        self.content_addressed = (
+            content_addressed
+            if content_addressed is not None
+            else getattr(settings, "STORAGE_BACKBLAZE_CONTENT_ADDRESSED", False)
+        )
+        self.content_prefix = (
+            content_prefix if content_prefix is not None else getattr(settings, "STORAGE_BACKBLAZE_CONTENT_PREFIX", "")
+        )
+        self.pool_size = pool_size or getattr(settings, "STORAGE_BACKBLAZE_POOL_SIZE", DEFAULT_POOL_SIZE)
 
-    def backblaze_authorize(self):
-        try:
-            auth_string = f"{self.account_id}:{self.app_key}".encode("utf-8")
-            encoded_auth_string = base64.b64encode(auth_string).decode("utf-8")
+        self.upload_concurrency = upload_concurrency or getattr(
+            settings, "STORAGE_BACKBLAZE_UPLOAD_CONCURRENCY", DEFAULT_UPLOAD_CONCURRENCY
+        )
 
-            response = requests.get(
-                "https://api.backblaze.com/b2api/v2/b2_authorize_account",
-                headers={"Authorization": f"Basic {encoded_auth_string}"},
-            )
+        self.large_file_threshold = large_file_threshold or getattr(
+            settings, "STORAGE_BACKBLAZE_LARGE_FILE_THRESHOLD", DEFAULT_LARGE_FILE_THRESHOLD
+        )
+        self.part_size = part_size or getattr(settings, "STORAGE_BACKBLAZE_PART_SIZE", DEFAULT_PART_SIZE)
+        self.part_workers = part_workers or getattr(settings, "STORAGE_BACKBLAZE_PART_WORKERS", DEFAULT_PART_WORKERS)
 
-            response.raise_for_status()
+        self.read_buffer_size = read_buffer_size or getattr(
+            settings, "STORAGE_BACKBLAZE_READ_BUFFER_SIZE", DEFAULT_READ_BUFFER_SIZE
+        )
+        self.metadata_negative_ttl = (
+            metadata_negative_ttl
+            if metadata_negative_ttl is not None
+            else getattr(settings, "STORAGE_BACKBLAZE_METADATA_NEGATIVE_TTL", DEFAULT_METADATA_NEGATIVE_TTL)
+        )
+        self._metadata = TTLCache(
+            ttl=metadata_ttl
+            if metadata_ttl is not None
+            else getattr(settings, "STORAGE_BACKBLAZE_METADATA_TTL", DEFAULT_METADATA_TTL)
+        )
 
-            if response.status_code == 200:
-                resp = response.json()
-                self.base_url = resp["apiUrl"]
-                self.download_url = resp["downloadUrl"]
-                self.authorization_token = resp["authorizationToken"]
-                return True
+        if self.part_size < MIN_PART_SIZE:
+            raise ValueError(f"Backblaze part_size must be at least {MIN_PART_SIZE} bytes.")
+        # Large files need at least two parts, and only the last one may be smaller than MIN_PART_SIZE.
+        if self.part_size >= self.large_file_threshold:
+            raise ValueError("Backblaze part_size must be smaller than large_file_threshold.")
+
+        self._auth_lock = threading.Lock()
+        self._upload_urls = UploadUrlPool(self._get_upload_url, self.upload_concurrency)
+        self._async_upload_urls = weakref.WeakKeyDictionary()
+
+    @property
+    def session(self):
+        return get_session(self.pool_size)
+
+    def _basic_authorization(self):
+        auth_string = f"{self.account_id}:{self.app_key}".encode("utf-8")
+        return f"Basic {base64.b64encode(auth_string).decode('utf-8')}"
+
+    def _store_authorization(self, resp):
+        auth = {
+            "apiUrl": resp["apiUrl"],
+            "downloadUrl": resp["downloadUrl"],
+            "authorizationToken": resp["authorizationToken"],
+        }
+        _authorizations.set((self.authorize_url, self.account_id, self.app_key), auth)
+        return auth
+
+    def _request(self, method, url, **kwargs):
+        """``session.request`` that retries connection errors and retryable statuses with a backoff."""
+        for attempt in range(API_ATTEMPTS):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError:
+                if attempt + 1 == API_ATTEMPTS:
+                    raise
+                delay = backoff_delay(attempt)
             else:
-                return False
+                if not is_retryable(response.status_code) or attempt + 1 == API_ATTEMPTS:
+                    return response
+                response.close()
+                delay = backoff_delay(attempt, response)
+
+            record_retry(self.metrics_backend)
+            time.sleep(delay)
+
+    @instrumented("authorize")
+    def _authorize(self):
+        response = self._request("GET", self.authorize_url, headers={"Authorization": self._basic_authorization()})
+        response.raise_for_status()
+        return self._store_authorization(response.json())
+
+    def _authorization(self):
+        """Cached account authorization; authorizes on first use and shortly before the token expires."""
+        key = (self.authorize_url, self.account_id, self.app_key)
+        auth = _authorizations.get(key)
+        if auth is None:
+            with self._auth_lock:
+                auth = _authorizations.get(key) or self._authorize()
+        return auth
+
+    def backblaze_authorize(self):
+        try:
+            self._authorize()
+            return True
         except requests.RequestException as e:
             return False
 
+    def _invalidate_authorization(self, token):
+        key = (self.authorize_url, self.account_id, self.app_key)
+        auth = _authorizations.get(key)
+        if auth is not None and auth["authorizationToken"] == token:
+            _authorizations.delete(key)
+
+    @property
+    def base_url(self):
+        return self._authorization()["apiUrl"]
+
+    @property
+    def download_url(self):
+        return self._authorization()["downloadUrl"]
+
+    @property
+    def authorization_token(self):
+        return self._authorization()["authorizationToken"]
+
     def _build_url(self, endpoint=None, authorization=True):
         return "%s%s" % (self.base_url, endpoint)
 
+    def _api(self, endpoint, payload):
+        """Call a B2 API ``endpoint``; an expired token is refreshed once, transient failures are retried."""
+        for attempt in range(2):
+            token = self.authorization_token
+            response = self._request(
+                "POST", self._build_url("/b2api/v2/%s" % endpoint), headers={"Authorization": token}, json=payload
+            )
+            if response.status_code == 401 and not attempt:
+                self._invalidate_authorization(token)
+                record_retry(self.metrics_backend)
+                continue
+            break
+
+        response.raise_for_status()
+        return response.json()
+
+    def _file_name(self, name):
+        return name.replace("\\", "/")
+
     def _normalize_filename(self, name):
-        normalized_name = name.replace("\\", "/")
-        parts = normalized_name.split("/")
-        encoded_parts = [urllib.parse.quote(part, safe="") for part in parts]
-        return "/".join(encoded_parts)
+        return quote_name(name)
 
     def _get_upload_url(self):
-        params = {"bucketId": self.bucket_id}
-        url = self._build_url("/b2api/v1/b2_get_upload_url")
-        headers = {"Authorization": self.authorization_token}
-        return requests.get(url, headers=headers, params=params).json()
+        return self._api("b2_get_upload_url", {"bucketId": self.bucket_id})
 
     def _temporary_storage(self, contents):
         return TemporaryFile(contents, "r+")
 
-    def save(self, name, content, max_length=None):
-        response = self._get_upload_url() or {}
-        
-        if "uploadUrl" not in response:
-            self.backblaze_authorize()
-            response = self._get_upload_url()
+    def _stat(self, name):
+        """Return the cached ``b2_list_file_names`` entry for ``name`` (``None`` if missing)."""
+        file_name = self._file_name(name)
+        info = self._metadata.get(file_name, _MISSING)
+        if info is not _MISSING:
+            return info
 
-        if "uploadUrl" not in response:
-            return False
+        payload = {"bucketId": self.bucket_id, "startFileName": file_name, "maxFileCount": 1}
+        files = self._api("b2_list_file_names", payload).get("files", [])
+        if not files or files[0]["fileName"] != file_name:
+            self._metadata.set(file_name, None, ttl=self.metadata_negative_ttl)
+            return None
+
+        self._metadata.set(file_name, files[0])
+        return files[0]
+
+    def _stat_or_raise(self, name):
+        info = self._stat(name)
+        if info is None:
+            raise FileNotFoundError(name)
+        return info
 
-        upload_url = response["uploadUrl"]
+    @staticmethod
+    def _modified_time(info):
+        millis = (info.get("fileInfo") or {}).get("src_last_modified_millis") or info["uploadTimestamp"]
+        return datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+
+    def _get_file_obj_and_size(self, content):
+        """Seekable file object for ``content`` and its size; unseekable streams are spooled first."""
+        file_obj = getattr(content, "file", None) or content
+        size = getattr(content, "size", None)
 
         try:
-            content.seek(0)
+            file_obj.seek(0)
+            if size is None:
+                size = file_obj.seek(0, os.SEEK_END)
+                file_obj.seek(0)
         except Exception:
-            pass
+            spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+            shutil.copyfileobj(file_obj, spooled)
+            size = spooled.tell()
+            spooled.seek(0)
+            file_obj = spooled
 
-        normalized_name = self._normalize_filename(name)
+        return file_obj, int(size)
 
-        headers = {
-            "Content-Type": "b2/x-auto",
-            "X-Bz-File-Name": normalized_name,
-            "X-Bz-Content-Sha1": "do_not_verify",
-            "X-Bz-Info-src_last_modified_millis": "",
-            "Authorization": response["authorizationToken"],
-        }
+    def _post_upload(self, upload_urls, headers, body):
+        """POST ``body`` to a pooled upload URL.
 
-        download_response = requests.post(upload_url, headers=headers, data=content.read())
+        A rejected URL is discarded and the upload is retried on another one
+        after a backoff; ``body`` is rewound before every attempt.
+        """
+        for attempt in range(UPLOAD_ATTEMPTS):
+            if hasattr(body, "rewind"):
+                body.rewind()
 
-        if download_response.status_code == 503:
-            attempts = 0
-            while attempts <= 3 and download_response.status_code == 503:
-                download_response = requests.post(
-                    upload_url,
-                    headers=headers,
-                    data=content.read(),
+            upload = None
+            try:
+                upload = upload_urls.acquire()
+                response = self.session.post(
+                    upload["uploadUrl"],
+                    headers={**headers, "Authorization": upload["authorizationToken"]},
+                    data=body,
                 )
-                attempts += 1
+            except requests.RequestException:
+                if upload is not None:
+                    upload_urls.discard(upload)
+                if attempt + 1 == UPLOAD_ATTEMPTS:
+                    raise
+                record_retry(self.metrics_backend)
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                upload_urls.release(upload)
+                return response
+
+            # B2 rejected this upload URL (busy or expired); the next attempt uses another one.
+            upload_urls.discard(upload)
+            if response.status_code not in UPLOAD_RETRY_STATUSES or attempt + 1 == UPLOAD_ATTEMPTS:
+                response.raise_for_status()
+                return response
+            record_retry(self.metrics_backend)
+            time.sleep(backoff_delay(attempt, response))
+
+    @instrumented("upload_part")
+    def _upload_part(self, upload_urls, part_number, data):
+        sha1 = hashlib.sha1(data).hexdigest()
+        headers = {"X-Bz-Part-Number": str(part_number), "X-Bz-Content-Sha1": sha1}
+        self._post_upload(upload_urls, headers, data)
+        return sha1
+
+    def _large_file_part_size(self, size):
+        """``part_size``, raised when ``size`` would otherwise need more than ``MAX_PARTS`` parts."""
+        return max(self.part_size, math.ceil(size / MAX_PARTS))
 
-        if download_response.status_code != 200:
-            download_response.raise_for_status()
+    def _save_large_file(self, name, file_obj, size):
+        """Upload ``file_obj`` with the large-file API, ``part_workers`` parts at a time.
 
-        resp = download_response.json()
+        Each worker reads its own part just before sending it, so at most
+        ``part_size * part_workers`` bytes are held in memory.
+        """
+        file_id = self._api(
+            "b2_start_large_file",
+            {"bucketId": self.bucket_id, "fileName": self._file_name(name), "contentType": "b2/x-auto"},
+        )["fileId"]
+
+        upload_urls = UploadUrlPool(
+            lambda: self._api("b2_get_upload_part_url", {"fileId": file_id}),
+            self.part_workers,
+        )
+        read_lock = threading.Lock()
+        part_size = self._large_file_part_size(size)
+
+        def upload_part(part_number):
+            with read_lock:
+                file_obj.seek((part_number - 1) * part_size)
+                data = file_obj.read(part_size)
+            return self._upload_part(upload_urls, part_number, data)
+
+        executor = ThreadPoolExecutor(max_workers=self.part_workers)
+        try:
+            futures = [executor.submit(upload_part, number) for number in range(1, math.ceil(size / part_size) + 1)]
+            done, _pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                future.result()
+            sha1s = [future.result() for future in futures]
+            executor.shutdown()
+
+            resp = self._api("b2_finish_large_file", {"fileId": file_id, "partSha1Array": sha1s})
+            self._metadata.delete(self._file_name(name))
+            return resp["fileName"]
+        except BaseException:
+            # Parts still queued are dropped; only the ones already uploading are waited for.
+            executor.shutdown(cancel_futures=True)
+            try:
+                self._api("b2_cancel_large_file", {"fileId": file_id})
+            except requests.RequestException:
+                pass
+            raise
+
+    @instrumented("save")
+    def save(self, name, content, max_length=None):
+        if self.content_addressed:
+            content, digest, _size = hash_content(getattr(content, "file", None) or content)
+            name = content_addressed_name(name, digest, self.content_prefix)
+            if self._stat(name) is not None:
+                return name
+
+        file_obj, size = self._get_file_obj_and_size(content)
+        record_bytes(self.metrics_backend, size, "save")
+        if size >= self.large_file_threshold:
+            return self._save_large_file(name, file_obj, size)
+
+        headers = {
+            "Content-Type": "b2/x-auto",
+            "X-Bz-File-Name": self._normalize_filename(name),
+            "X-Bz-Content-Sha1": "hex_digits_at_end",
+            "X-Bz-Info-src_last_modified_millis": "",
+        }
+        response = self._post_upload(self._upload_urls, headers, Sha1TrailingReader(file_obj, size))
+        self._metadata.delete(self._file_name(name))
+        resp = response.json()
 
         if "fileName" in resp:
             return resp["fileName"]
         else:
             pass
 
+    @instrumented("exists")
     def exists(self, name):
-        return False
+        return self._stat(name) is not None
 
-    def open(self, name, mode="rb"):
-        headers = {"Authorization": self.authorization_token}
-        normalized_name = self._normalize_filename(name)
-        resp = requests.get(
-            "%s/file/%s/%s" % (self.download_url, self.bucket_name, normalized_name),
-            headers=headers,
-        ).content
+    @instrumented("size")
+    def size(self, name):
+        return self._stat_or_raise(name)["contentLength"]
+
+    @instrumented("get_modified_time")
+    def get_modified_time(self, name):
+        return self._modified_time(self._stat_or_raise(name))
+
+    @instrumented("get_version")
+    def get_version(self, name):
+        return self._stat_or_raise(name)["fileId"]
+
+    @instrumented("listdir")
+    def listdir(self, path):
+        prefix = path.strip("/")
+        prefix = f"{prefix}/" if prefix else ""
+        payload = {"bucketId": self.bucket_id, "prefix": prefix, "delimiter": "/", "maxFileCount": 1000}
+
+        directories, files = [], []
+        while True:
+            resp = self._api("b2_list_file_names", payload)
+            for f in resp.get("files", []):
+                if f.get("action") == "folder":
+                    directories.append(f["fileName"][len(prefix):].rstrip("/"))
+                else:
+                    files.append(f["fileName"][len(prefix):])
+                    self._metadata.set(f["fileName"], f)
+
+            if not resp.get("nextFileName"):
+                break
+            payload["startFileName"] = resp["nextFileName"]
+
+        return directories, files
+
+    def _file_versions(self, name):
+        file_name = self._file_name(name)
+        payload = {"bucketId": self.bucket_id, "startFileName": file_name, "maxFileCount": 100}
+        files = self._api("b2_list_file_versions", payload).get("files", [])
+        return [f for f in files if f["fileName"] == file_name]
+
+    def _is_shared(self, name):
+        """Content-addressed objects may back several rows; only ``cleanup_storage`` removes them."""
+        return self.content_addressed and is_content_addressed_name(self._file_name(name), self.content_prefix)
+
+    @instrumented("delete")
+    def delete(self, name):
+        if not self._is_shared(name):
+            self._delete_versions(name)
+
+    def _delete_versions(self, name):
+        for version in self._file_versions(name):
+            self._api(
+                "b2_delete_file_version",
+                {"fileName": version["fileName"], "fileId": version["fileId"]},
+            )
+        self._metadata.delete(self._file_name(name))
+
+    @instrumented("delete_many")
+    def delete_many(self, names):
+        """Delete ``names`` concurrently (B2 has no batch delete); return the names that failed.
+
+        Content-addressed objects are deleted too: callers must have checked that nothing references them.
+        """
+
+        def delete(name):
+            try:
+                self._delete_versions(name)
+            except requests.RequestException:
+                return name
 
-        output = BytesIO()
-        output.write(resp)
-        output.seek(0)
-        return File(output, name)
+        with ThreadPoolExecutor(max_workers=self.delete_workers) as executor:
+            return [name for name in executor.map(delete, names) if name is not None]
+
+    def iter_objects(self, prefix=""):
+        payload = {"bucketId": self.bucket_id, "prefix": prefix, "maxFileCount": 1000}
+
+        while True:
+            resp = self._api("b2_list_file_names", payload)
+            for f in resp.get("files", []):
+                if f.get("action") == "folder":
+                    continue
+                yield f["fileName"], datetime.fromtimestamp(f["uploadTimestamp"] / 1000, tz=timezone.utc)
+
+            if not resp.get("nextFileName"):
+                break
+            payload["startFileName"] = resp["nextFileName"]
+
+    @instrumented("download")
+    def _download(self, name, offset=0):
+        """Streaming ``GET`` of ``name`` from byte ``offset``; returns the raw urllib3 response."""
+        url = "%s/file/%s/%s" % (self.download_url, self.bucket_name, self._normalize_filename(name))
+
+        for attempt in range(2):
+            token = self.authorization_token
+            headers = {"Authorization": token}
+            if offset:
+                headers["Range"] = "bytes=%d-" % offset
+
+            response = self._request("GET", url, headers=headers, stream=True)
+            if response.status_code == 401 and not attempt:
+                response.close()
+                self._invalidate_authorization(token)
+                record_retry(self.metrics_backend)
+                continue
+            break
+
+        if response.status_code == 404:
+            response.close()
+            self._metadata.delete(self._file_name(name))
+            raise FileNotFoundError(name)
+
+        response.raise_for_status()
+        return response.raw
+
+    @instrumented("open")
+    def open(self, name, mode="rb"):
+        size = self._stat_or_raise(name)["contentLength"]
+        on_read = functools.partial(record_bytes, self.metrics_backend, operation="download")
+        reader = RangeReader(lambda offset: self._download(name, offset), size, on_read)
+        return RemoteFile(reader, name, size, self.read_buffer_size)
 
     def url(self, name):
+        if self.signed_urls:
+            return self.signed_url(name)
+
         normalized_name = self._normalize_filename(name)
         return "%s/file/%s/%s" % (self.download_url, self.bucket_name, normalized_name)
+
+    def urls(self, names):
+        """``url()`` for many names at once.
+
+        Each distinct name is resolved once; download authorizations for signed
+        URLs that are not cached yet are requested concurrently.
+        """
+        if not self.signed_urls:
+            prefix = "%s/file/%s/" % (self.download_url, self.bucket_name)
+            return [prefix + self._normalize_filename(name) for name in names]
+        return resolve_many(names, self.signed_url, max_workers=self.pool_size)
+
+    @instrumented("authorize_download")
+    def _get_download_authorization(self, name, expires):
+        payload = {
+            "bucketId": self.bucket_id,
+            "fileNamePrefix": self._file_name(name),
+            "validDurationInSeconds": int(expires),
+        }
+        return self._api("b2_get_download_authorization", payload)["authorizationToken"]
+
+    def signed_url(self, name, expires=None):
+        cached = expires is None
+        expires = expires or self.url_expires
+
+        url = self._signed_urls.get(name) if cached else None
+        if url is None:
+            url = self._signed_download_url(name, self._get_download_authorization(name, expires))
+            if cached:
+                self._signed_urls.set(name, url)
+
+        return url
+
+    def _signed_download_url(self, name, token):
+        return "%s/file/%s/%s?Authorization=%s" % (
+            self.download_url,
+            self.bucket_name,
+            self._normalize_filename(name),
+            urllib.parse.quote(token, safe=""),
+        )
+
+    # Async API: native coroutines over a pooled httpx client. Authorizations,
+    # metadata and signed URLs are shared with the sync methods.
+
+    @property
+    def async_client(self):
+        return get_async_client(self.pool_size)
+
+    async def _arequest(self, method, url, stream=False, **kwargs):
+        """Async ``_request``; with ``stream`` the returned response must be closed by the caller."""
+        client = self.async_client
+        for attempt in range(API_ATTEMPTS):
+            try:
+                response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+            except httpx.TransportError:
+                if attempt + 1 == API_ATTEMPTS:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                if not is_retryable(response.status_code) or attempt + 1 == API_ATTEMPTS:
+                    return response
+                await response.aclose()
+                delay = backoff_delay(attempt, response)
+
+            record_retry(self.metrics_backend)
+            await asyncio.sleep(delay)
+
+    @instrumented("authorize")
+    async def _aauthorize(self):
+        response = await self._arequest("GET", self.authorize_url, headers={"Authorization": self._basic_authorization()})
+        response.raise_for_status()
+        return self._store_authorization(response.json())
+
+    async def _aauthorization(self):
+        key = (self.authorize_url, self.account_id, self.app_key)
+        return _authorizations.get(key) or await _async_authorizations.run(key, self._aauthorize)
+
+    async def _aapi(self, endpoint, payload):
+        for attempt in range(2):
+            auth = await self._aauthorization()
+            response = await self._arequest(
+                "POST",
+                "%s/b2api/v2/%s" % (auth["apiUrl"], endpoint),
+                headers={"Authorization": auth["authorizationToken"]},
+                json=payload,
+            )
+            if response.status_code == 401 and not attempt:
+                self._invalidate_authorization(auth["authorizationToken"])
+                record_retry(self.metrics_backend)
+                continue
+            break
+
+        response.raise_for_status()
+        return response.json()
+
+    def _aupload_urls(self):
+        loop = asyncio.get_running_loop()
+        pool = self._async_upload_urls.get(loop)
+        if pool is None:
+            pool = self._async_upload_urls[loop] = AsyncUploadUrlPool(
+                lambda: self._aapi("b2_get_upload_url", {"bucketId": self.bucket_id}), self.upload_concurrency
+            )
+        return pool
+
+    async def _astat(self, name):
+        file_name = self._file_name(name)
+        info = self._metadata.get(file_name, _MISSING)
+        if info is not _MISSING:
+            return info
+
+        payload = {"bucketId": self.bucket_id, "startFileName": file_name, "maxFileCount": 1}
+        files = (await self._aapi("b2_list_file_names", payload)).get("files", [])
+        if not files or files[0]["fileName"] != file_name:
+            self._metadata.set(file_name, None, ttl=self.metadata_negative_ttl)
+            return None
+
+        self._metadata.set(file_name, files[0])
+        return files[0]
+
+    async def _astat_or_raise(self, name):
+        info = await self._astat(name)
+        if info is None:
+            raise FileNotFoundError(name)
+        return info
+
+    @instrumented("exists")
+    async def aexists(self, name):
+        return await self._astat(name) is not None
+
+    async def _apost_upload(self, upload_urls, headers, make_body):
+        """Async ``_post_upload``; ``make_body()`` returns a fresh body for every attempt."""
+        for attempt in range(UPLOAD_ATTEMPTS):
+            upload = None
+            try:
+                upload = await upload_urls.acquire()
+                response = await self.async_client.post(
+                    upload["uploadUrl"],
+                    headers={**headers, "Authorization": upload["authorizationToken"]},
+                    content=make_body(),
+                )
+            except httpx.HTTPError:
+                if upload is not None:
+                    await upload_urls.discard(upload)
+                if attempt + 1 == UPLOAD_ATTEMPTS:
+                    raise
+                record_retry(self.metrics_backend)
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                await upload_urls.release(upload)
+                return response
+
+            await upload_urls.discard(upload)
+            if response.status_code not in UPLOAD_RETRY_STATUSES or attempt + 1 == UPLOAD_ATTEMPTS:
+                response.raise_for_status()
+                return response
+            record_retry(self.metrics_backend)
+            await asyncio.sleep(backoff_delay(attempt, response))
+
+    async def _aread_sha1_trailing(self, file_obj, size):
+        """Async body of ``size`` bytes of ``file_obj`` followed by their hex SHA1."""
+        file_obj.seek(0)
+        digest = hashlib.sha1()
+        remaining = size
+        while remaining > 0:
+            chunk = await asyncio.to_thread(file_obj.read, min(DEFAULT_READ_BUFFER_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+            yield chunk
+        yield digest.hexdigest().encode("ascii")
+
+    @instrumented("upload_part")
+    async def _aupload_part(self, upload_urls, part_number, data):
+        sha1 = await asyncio.to_thread(lambda: hashlib.sha1(data).hexdigest())
+        headers = {"X-Bz-Part-Number": str(part_number), "X-Bz-Content-Sha1": sha1}
+        await self._apost_upload(upload_urls, headers, lambda: data)
+        return sha1
+
+    async def _asave_large_file(self, name, file_obj, size):
+        """Async ``_save_large_file``: at most ``part_workers`` parts are read and in flight at once."""
+        file_id = (
+            await self._aapi(
+                "b2_start_large_file",
+                {"bucketId": self.bucket_id, "fileName": self._file_name(name), "contentType": "b2/x-auto"},
+            )
+        )["fileId"]
+
+        upload_urls = AsyncUploadUrlPool(
+            lambda: self._aapi("b2_get_upload_part_url", {"fileId": file_id}), self.part_workers
+        )
+        slots = asyncio.Semaphore(self.part_workers)
+        tasks = []
+        part_size = self._large_file_part_size(size)
+
+        async def upload_part(part_number, data):
+            try:
+                return await self._aupload_part(upload_urls, part_number, data)
+            finally:
+                slots.release()
+
+        try:
+            file_obj.seek(0)
+            for part_number in range(1, math.ceil(size / part_size) + 1):
+                await slots.acquire()
+                for task in tasks:
+                    if task.done() and task.exception() is not None:
+                        raise task.exception()
+                data = await asyncio.to_thread(file_obj.read, part_size)
+                tasks.append(asyncio.ensure_future(upload_part(part_number, data)))
+
+            sha1s = await asyncio.gather(*tasks)
+            resp = await self._aapi("b2_finish_large_file", {"fileId": file_id, "partSha1Array": sha1s})
+            self._metadata.delete(self._file_name(name))
+            return resp["fileName"]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self._aapi("b2_cancel_large_file", {"fileId": file_id})
+            except httpx.HTTPError:
+                pass
+            raise
+
+    @instrumented("save")
+    async def asave(self, name, content, max_length=None):
+        if self.content_addressed:
+            content, digest, _size = await asyncio.to_thread(hash_content, getattr(content, "file", None) or content)
+            name = content_addressed_name(name, digest, self.content_prefix)
+            if await self._astat(name) is not None:
+                return name
+
+        file_obj, size = await asyncio.to_thread(self._get_file_obj_and_size, content)
+        record_bytes(self.metrics_backend, size, "save")
+        if size >= self.large_file_threshold:
+            return await self._asave_large_file(name, file_obj, size)
+
+        headers = {
+            "Content-Type": "b2/x-auto",
+            "Content-Length": str(size + 40),
+            "X-Bz-File-Name": self._normalize_filename(name),
+            "X-Bz-Content-Sha1": "hex_digits_at_end",
+            "X-Bz-Info-src_last_modified_millis": "",
+        }
+        response = await self._apost_upload(
+            self._aupload_urls(), headers, lambda: self._aread_sha1_trailing(file_obj, size)
+        )
+        self._metadata.delete(self._file_name(name))
+        return response.json().get("fileName")
+
+    @instrumented("download")
+    async def _adownload(self, name, offset=0):
+        """Async ``_download``; returns a streaming ``httpx.Response``."""
+        for attempt in range(2):
+            auth = await self._aauthorization()
+            url = "%s/file/%s/%s" % (auth["downloadUrl"], self.bucket_name, self._normalize_filename(name))
+            headers = {"Authorization": auth["authorizationToken"]}
+            if offset:
+                headers["Range"] = "bytes=%d-" % offset
+
+            response = await self._arequest("GET", url, headers=headers, stream=True)
+            if response.status_code == 401 and not attempt:
+                await response.aclose()
+                self._invalidate_authorization(auth["authorizationToken"])
+                record_retry(self.metrics_backend)
+                continue
+            break
+
+        if response.status_code >= 400:
+            await response.aclose()
+            if response.status_code == 404:
+                self._metadata.delete(self._file_name(name))
+                raise FileNotFoundError(name)
+            response.raise_for_status()
+        return response
+
+    @instrumented("open")
+    async def aopen(self, name, mode="rb"):
+        size = (await self._astat_or_raise(name))["contentLength"]
+        on_read = functools.partial(record_bytes, self.metrics_backend, operation="download")
+        return AsyncRemoteFile(lambda offset: self._adownload(name, offset), name, size, self.read_buffer_size, on_read)
+
+    @instrumented("delete")
+    async def adelete(self, name):
+        if self._is_shared(name):
+            return
+
+        file_name = self._file_name(name)
+        payload = {"bucketId": self.bucket_id, "startFileName": file_name, "maxFileCount": 100}
+        versions = [
+            f for f in (await self._aapi("b2_list_file_versions", payload)).get("files", []) if f["fileName"] == file_name
+        ]
+        await asyncio.gather(
+            *(
+                self._aapi("b2_delete_file_version", {"fileName": v["fileName"], "fileId": v["fileId"]})
+                for v in versions
+            )
+        )
+        self._metadata.delete(file_name)
+
+    @instrumented("authorize_download")
+    async def _aget_download_authorization(self, name, expires):
+        payload = {
+            "bucketId": self.bucket_id,
+            "fileNamePrefix": self._file_name(name),
+            "validDurationInSeconds": int(expires),
+        }
+        return (await self._aapi("b2_get_download_authorization", payload))["authorizationToken"]
+
+    async def aurl(self, name):
+        # url() only needs the cached authorization and, for signed URLs, a cached download token.
+        await self._aauthorization()
+        if self.signed_urls and self._signed_urls.get(name) is None:
+            token = await self._aget_download_authorization(name, self.url_expires)
+            self._signed_urls.set(name, self._signed_download_url(name, token))
+        return self.url(name)
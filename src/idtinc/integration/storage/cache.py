@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, List, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def resolve_many(names: Iterable[str], resolve: Callable[[str], Any], max_workers: int = 1) -> List[Any]:
+    """``[resolve(name) for name in names]``, calling ``resolve`` once per distinct name.
+
+    With ``max_workers > 1`` the distinct names are resolved concurrently.
+    """
+    names = list(names)
+    distinct = list(dict.fromkeys(names))
+
+    if max_workers > 1 and len(distinct) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(distinct))) as executor:
+            resolved = dict(zip(distinct, executor.map(resolve, distinct)))
+    else:
+        resolved = {name: resolve(name) for name in distinct}
+
+    return [resolved[name] for name in names]
+
+
+def signed_url_ttl(expires: float) -> float:
+    """How long a signed URL valid for ``expires`` seconds may be handed out.
+
+    Leaves a margin of 10% (at most five minutes) so a reused URL never reaches
+    the client already expired.
+    """
+    return max(expires - min(expires * 0.1, 300), 0)
@@ -0,0 +1,275 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+from .metrics import instrumented, record_bytes
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+@contextlib.contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """Exclusive ``flock`` on ``path``; yields ``False`` if ``blocking`` is off and the lock is taken.
+
+    The holder may unlink ``path``: a waiter that then gets the lock on the
+    unlinked file notices and locks the file now at ``path`` instead.
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+    while True:
+        with open(path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                yield False
+                return
+
+            opened = os.fstat(lock_file.fileno())
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+                continue
+
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return
+
+
+@deconstructible
+class CachedStorage(Storage):
+    """Read-through local disk cache in front of another storage backend.
+
+    Hot objects are kept under ``directory`` and evicted least-recently-used
+    first once they exceed ``max_size`` bytes. Every ``open()`` revalidates the
+    local copy against the backend's ``get_version()`` (ETag) or
+    ``get_modified_time()``. Writes go straight to the backend and drop the
+    local copy. File locks make the directory safe to share between workers.
+
+    Reads configuration from Django settings when not provided explicitly:
+    - STORAGE_CACHE_BACKEND (import path, e.g. "idtinc.integration.storage.MinioStorage")
+    - STORAGE_CACHE_OPTIONS
+    - STORAGE_CACHE_DIRECTORY
+    - STORAGE_CACHE_MAX_SIZE
+    """
+
+    metrics_backend = "cached"
+
+    def __init__(
+        self,
+        backend=None,
+        options: Optional[dict] = None,
+        directory: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ):
+        from django.conf import settings
+
+        backend = backend or getattr(settings, "STORAGE_CACHE_BACKEND", None)
+        if not backend:
+            raise ValueError("CachedStorage requires a backend.")
+
+        if isinstance(backend, str):
+            options = options if options is not None else getattr(settings, "STORAGE_CACHE_OPTIONS", {})
+            backend = import_string(backend)(**options)
+
+        self.storage = backend
+        self.directory = directory or getattr(
+            settings,
+            "STORAGE_CACHE_DIRECTORY",
+            os.path.join(tempfile.gettempdir(), "idtinc-storage-cache"),
+        )
+        self.max_size = max_size or getattr(settings, "STORAGE_CACHE_MAX_SIZE", DEFAULT_CACHE_MAX_SIZE)
+
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _get_version(self, name: str) -> str:
+        get_version = getattr(self.storage, "get_version", None)
+        if get_version is not None:
+            return get_version(name)
+
+        try:
+            return str(self.storage.get_modified_time(name))
+        except NotImplementedError:
+            return ""
+
+    def _read_version(self, path: str) -> Optional[str]:
+        try:
+            with open(f"{path}.meta") as f:
+                return json.load(f)["version"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    @instrumented("fetch")
+    def _fetch(self, name: str, path: str, version: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp, self.storage.open(name, "rb") as remote:
+                for chunk in remote.chunks(DEFAULT_CHUNK_SIZE):
+                    tmp.write(chunk)
+                size = tmp.tell()
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+        with open(f"{path}.meta", "w") as f:
+            json.dump({"name": name, "version": version, "size": size}, f)
+        record_bytes(self.metrics_backend, size, "fetch")
+
+        with self._lock:
+            self._written += size
+
+    def _invalidate(self, name: str) -> None:
+        path = self._path(name)
+        if not os.path.isdir(os.path.dirname(path)):
+            return
+        with file_lock(f"{path}.lock"):
+            self._remove_entry(path)
+
+    @staticmethod
+    def _remove_entry(path: str) -> None:
+        """Remove the entry at ``path`` and its lock file; the caller holds that lock."""
+        for suffix in (".meta", "", ".lock"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path + suffix)
+
+    @instrumented("open")
+    def open(self, name: str, mode: str = "rb"):
+        if "r" not in mode or "+" in mode:
+            return self.storage.open(name, mode)
+
+        path = self._path(name)
+        version = self._get_version(name)
+
+        for _attempt in range(2):
+            if self._read_version(path) != version or not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with file_lock(f"{path}.lock"):
+                    if self._read_version(path) != version or not os.path.exists(path):
+                        self._fetch(name, path, version)
+
+            try:
+                local_file = open(path, mode)
+            except FileNotFoundError:
+                # Evicted by another worker between the check and the open.
+                continue
+
+            os.utime(path)
+            self.evict()
+            return File(local_file, name)
+
+        return self.storage.open(name, mode)
+
+    def evict(self, force: bool = False) -> None:
+        """Remove least-recently-used entries until the cache is below 90% of ``max_size``.
+
+        Runs only after roughly 10% of ``max_size`` has been written since the
+        last pass (or when ``force`` is set) and skips when another process is
+        already evicting.
+        """
+        with self._lock:
+            if not force and self._written < self.max_size * 0.1:
+                return
+            self._written = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        with file_lock(os.path.join(self.directory, ".evict.lock"), blocking=False) as locked:
+            if not locked:
+                return
+
+            entries, locked_paths, total = [], [], 0
+            for root, _dirs, files in os.walk(self.directory):
+                for filename in files:
+                    if filename.endswith(".lock") and not filename.startswith("."):
+                        locked_paths.append(os.path.join(root, filename[: -len(".lock")]))
+                    if filename.startswith(".") or "." in filename:
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            # Lock files whose entry is gone (a failed fetch, a crash) are swept here.
+            for path in locked_paths:
+                if os.path.exists(path):
+                    continue
+                with file_lock(f"{path}.lock", blocking=False) as entry_locked:
+                    if entry_locked and not os.path.exists(path):
+                        with contextlib.suppress(FileNotFoundError):
+                            os.remove(f"{path}.lock")
+
+            if total <= self.max_size:
+                return
+
+            target = self.max_size * 0.9
+            for _mtime, size, path in sorted(entries):
+                if total <= target:
+                    break
+                with file_lock(f"{path}.lock", blocking=False) as entry_locked:
+                    if not entry_locked:
+                        continue
+                    self._remove_entry(path)
+                total -= size
+
+    def save(self, name, content, max_length=None):
+        name = self.storage.save(name, content, max_length=max_length)
+        self._invalidate(name)
+        return name
+
+    def delete(self, name):
+        self.storage.delete(name)
+        self._invalidate(name)
+
+    def exists(self, name):
+        return self.storage.exists(name)
+
+    def size(self, name):
+        return self.storage.size(name)
+
+    def url(self, name):
+        return self.storage.url(name)
+
+    def listdir(self, path):
+        return self.storage.listdir(path)
+
+    def get_modified_time(self, name):
+        return self.storage.get_modified_time(name)
+
+    def get_available_name(self, name, max_length=None):
+        return self.storage.get_available_name(name, max_length=max_length)
+
+    def __getattr__(self, name):
+        if name == "storage":
+            raise AttributeError(name)
+        return getattr(self.storage, name)
@@ -0,0 +1,162 @@
+import functools
+import hashlib
+import io
+import os
+import posixpath
+import tempfile
+import urllib.parse
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+
+from django.core.files.base import File
+
+DEFAULT_READ_BUFFER_SIZE = 1024 * 1024
+DEFAULT_HASH_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_MEMORY = 10 * 1024 * 1024
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable raw reader over a remote object.
+
+    ``open_range(offset)`` must return a streaming response positioned at
+    ``offset`` that exposes ``read(n)`` and ``close()``. The response is opened
+    lazily on the first read and reopened only when a seek moves the position.
+    ``on_read(n)``, if given, is called with the size of every chunk read.
+    """
+
+    def __init__(self, open_range: Callable[[int], Any], size: int, on_read: Optional[Callable[[int], None]] = None):
+        super().__init__()
+        self._open_range = open_range
+        self._size = size
+        self._on_read = on_read
+        self._position = 0
+        self._response = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        if position != self._position:
+            self._release()
+            self._position = position
+
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self._size:
+            return 0
+
+        if self._response is None:
+            self._response = self._open_range(self._position)
+
+        data = self._response.read(min(len(buffer), self._size - self._position))
+        if not data:
+            return 0
+
+        length = len(data)
+        buffer[:length] = data
+        self._position += length
+        if self._on_read is not None:
+            self._on_read(length)
+        return length
+
+    def close(self) -> None:
+        self._release()
+        super().close()
+
+    def _release(self) -> None:
+        response, self._response = self._response, None
+        if response is None:
+            return
+
+        response.close()
+        if hasattr(response, "release_conn"):
+            response.release_conn()
+
+
+class RemoteFile(File):
+    """Lazy ``File`` over a ``RangeReader``.
+
+    Memory use is bounded by ``buffer_size`` whatever the object size.
+    """
+
+    def __init__(self, reader: RangeReader, name: str, size: int, buffer_size: Optional[int] = None):
+        super().__init__(io.BufferedReader(reader, buffer_size or DEFAULT_READ_BUFFER_SIZE), name)
+        self._size = size
+        self.mode = "rb"
+
+
+def hash_content(
+    file_obj: BinaryIO,
+    algorithm: str = "sha256",
+    chunk_size: int = DEFAULT_HASH_CHUNK_SIZE,
+) -> Tuple[BinaryIO, str, int]:
+    """Hash ``file_obj`` in a single streaming pass.
+
+    Returns a file positioned at the start, the hex digest and the size.
+    Non-seekable streams are copied into a spooled temporary file while they
+    are hashed, so they can still be uploaded afterwards.
+    """
+    digest = hashlib.new(algorithm)
+    size = 0
+
+    try:
+        file_obj.seek(0)
+        target = None
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        target = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+        if target is not None:
+            target.write(chunk)
+
+    if target is None:
+        target = file_obj
+    target.seek(0)
+
+    return target, digest.hexdigest(), size
+
+
+@functools.lru_cache(maxsize=4096)
+def quote_name(name: str) -> str:
+    """URL-quote every path segment of ``name``; backslashes are treated as separators."""
+    return "/".join(urllib.parse.quote(part, safe="") for part in name.replace("\\", "/").split("/"))
+
+
+def content_addressed_name(name: str, digest: str, prefix: str = "") -> str:
+    """``<prefix>/ab/cd/abcd....ext`` for ``digest``, keeping the extension of ``name``."""
+    extension = os.path.splitext(name)[1].lower()
+    return posixpath.join(prefix, digest[:2], digest[2:4], f"{digest}{extension}")
+
+
+def is_content_addressed_name(name: str, prefix: str = "") -> bool:
+    """Whether ``name`` has the ``content_addressed_name`` layout under ``prefix``."""
+    directory, filename = posixpath.split(name)
+    digest = filename.split(".", 1)[0]
+    return (
+        len(digest) == 64
+        and all(char in "0123456789abcdef" for char in digest)
+        and directory == posixpath.join(prefix, digest[:2], digest[2:4])
+    )
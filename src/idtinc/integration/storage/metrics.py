@@ -0,0 +1,234 @@
+import bisect
+import contextvars
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Operations that run outside a tracked call (pool workers, background threads) are recorded under this name.
+UNTRACKED_OPERATION = "background"
+
+_operation: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("idtinc_storage_operation", default=None)
+_request_timings: contextvars.ContextVar[Optional[Dict[Tuple[str, str], List[float]]]] = contextvars.ContextVar(
+    "idtinc_storage_request_timings", default=None
+)
+
+
+class OperationStats:
+    __slots__ = ("count", "errors", "retries", "bytes", "seconds", "buckets")
+
+    def __init__(self, buckets: int):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.buckets = [0] * buckets
+
+
+class StorageMetrics:
+    """Process-wide counters and latency histograms keyed by ``(backend, operation)``.
+
+    ``buckets`` are the upper bounds (seconds) of the latency histogram; one
+    more bucket catches everything slower. Thread-safe.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, backend: str, operation: str) -> OperationStats:
+        stats = self._stats.get((backend, operation))
+        if stats is None:
+            stats = self._stats[(backend, operation)] = OperationStats(len(self.buckets) + 1)
+        return stats
+
+    def observe(self, backend: str, operation: str, seconds: float, error: bool = False, nested: bool = False) -> None:
+        """Record one call; ``nested`` calls (inside another tracked one) are left out of the request timings."""
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats = self._get(backend, operation)
+            stats.count += 1
+            stats.seconds += seconds
+            stats.buckets[index] += 1
+            if error:
+                stats.errors += 1
+
+        timings = _request_timings.get()
+        if timings is not None and not nested:
+            timing = timings.setdefault((backend, operation), [0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+
+    def add_bytes(self, backend: str, operation: str, count: int) -> None:
+        if count <= 0:
+            return
+        with self._lock:
+            self._get(backend, operation).bytes += count
+
+    def add_retry(self, backend: str, operation: str) -> None:
+        with self._lock:
+            self._get(backend, operation).retries += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [
+                (backend, operation, stats.count, stats.errors, stats.retries, stats.bytes, stats.seconds,
+                 list(stats.buckets))
+                for (backend, operation), stats in sorted(self._stats.items())
+            ]
+
+        snapshot = []
+        for backend, operation, count, errors, retries, size, seconds, buckets in items:
+            snapshot.append(
+                {
+                    "backend": backend,
+                    "operation": operation,
+                    "count": count,
+                    "errors": errors,
+                    "retries": retries,
+                    "bytes": size,
+                    "seconds": round(seconds, 6),
+                    "p50": _percentile(self.buckets, buckets, count, 0.5),
+                    "p95": _percentile(self.buckets, buckets, count, 0.95),
+                    "p99": _percentile(self.buckets, buckets, count, 0.99),
+                    "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], buckets)),
+                }
+            )
+        return snapshot
+
+    def render_prometheus(self, prefix: str = "idtinc_storage") -> str:
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        for metric, key, help_text in (
+            ("operations_total", "count", "Storage operations."),
+            ("errors_total", "errors", "Storage operations that raised."),
+            ("retries_total", "retries", "Retried storage requests."),
+            ("bytes_total", "bytes", "Bytes uploaded or downloaded."),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for entry in snapshot:
+                lines.append(f"{prefix}_{metric}{{{_labels(entry)}}} {entry[key]}")
+
+        name = f"{prefix}_operation_duration_seconds"
+        lines.append(f"# HELP {name} Storage operation latency.")
+        lines.append(f"# TYPE {name} histogram")
+        for entry in snapshot:
+            labels = _labels(entry)
+            cumulative = 0
+            for bound, count in entry["buckets"].items():
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {entry['seconds']}")
+            lines.append(f"{name}_count{{{labels}}} {entry['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _percentile(bounds, buckets, count, quantile):
+    """Upper bound of the bucket holding ``quantile`` of the observations (``None`` past the last bound)."""
+    seen = 0
+    for bound, bucket in zip(bounds, buckets):
+        seen += bucket
+        if count and seen >= quantile * count:
+            return bound
+    return None
+
+
+def _labels(entry: Dict[str, Any]) -> str:
+    return f'backend="{entry["backend"]}",operation="{entry["operation"]}"'
+
+
+metrics = StorageMetrics()
+
+
+def current_operation() -> str:
+    return _operation.get() or UNTRACKED_OPERATION
+
+
+@contextmanager
+def track(backend: str, operation: str) -> Iterator[None]:
+    """Time the block as ``operation`` on ``backend``; exceptions other than ``FileNotFoundError`` count as errors."""
+    nested = _operation.get() is not None
+    token = _operation.set(operation)
+    started_at = time.perf_counter()
+    error = False
+    try:
+        yield
+    except FileNotFoundError:
+        raise
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _operation.reset(token)
+        metrics.observe(backend, operation, time.perf_counter() - started_at, error, nested)
+
+
+def instrumented(operation: str):
+    """Method decorator (sync or async): ``track`` the call under the instance's ``metrics_backend``."""
+
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+
+            @wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                with track(self.metrics_backend, operation):
+                    return await method(self, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with track(self.metrics_backend, operation):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_bytes(backend: str, count: int, operation: Optional[str] = None) -> None:
+    metrics.add_bytes(backend, operation or current_operation(), count)
+
+
+def record_retry(backend: str, operation: Optional[str] = None) -> None:
+    metrics.add_retry(backend, operation or current_operation())
+
+
+def start_request_timings() -> Tuple[Dict[Tuple[str, str], List[float]], contextvars.Token]:
+    """Collect the storage time of the current request.
+
+    Only top-level operations are collected, so nested ones (a cache miss
+    inside ``cached/open``, an authorization inside ``exists``) are not counted
+    twice. Returns the dict that fills up and the token for ``stop_request_timings``.
+    """
+    timings: Dict[Tuple[str, str], List[float]] = {}
+    return timings, _request_timings.set(timings)
+
+
+def stop_request_timings(token: contextvars.Token) -> None:
+    try:
+        _request_timings.reset(token)
+    except ValueError:
+        # Sync middleware under ASGI runs each hook in its own copy of the context.
+        _request_timings.set(None)
+
+
+def server_timing(timings: Dict[Tuple[str, str], List[float]]) -> str:
+    """``Server-Timing`` header value for ``timings``, one entry per backend and operation."""
+    return ", ".join(
+        f'storage-{backend}-{operation};dur={seconds * 1000:.1f};desc="{count} calls"'
+        for (backend, operation), (count, seconds) in sorted(timings.items())
+    )
@@ -1,13 +1,80 @@
-from io import BytesIO
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
 from tempfile import NamedTemporaryFile
-from typing import BinaryIO, Optional
-from urllib.parse import urlparse
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlparse, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
 
-from django.core.files.base import File
+import certifi
+import urllib3
 from django.core.files.storage import Storage
 from django.utils.deconstruct import deconstructible
 from minio import Minio
-from minio.error import S3Error
+from minio.credentials import Credentials
+from minio.datatypes import Object, PostPolicy
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error, ServerError
+from minio.helpers import MIN_PART_SIZE
+from minio.signer import sign_v4_s3
+from minio.time import from_http_header, to_amz_date, utcnow
+from urllib3 import Retry, Timeout
+
+from .aio import DEFAULT_ASYNC_POOL_SIZE, AsyncRemoteFile, SingleFlight, get_async_client, httpx
+from .cache import TTLCache, resolve_many, signed_url_ttl
+from .files import (DEFAULT_READ_BUFFER_SIZE, RangeReader, RemoteFile, content_addressed_name, hash_content,
+                    is_content_addressed_name)
+from .metrics import instrumented, record_bytes, record_retry, track
+from .sigv4 import UNSIGNED_PAYLOAD, object_url, presign_v4
+
+logger = logging.getLogger("storage")
+
+_MISSING = object()
+_region_lookups = SingleFlight()
+# (endpoint URL, bucket) -> region resolved with GetBucketLocation, shared by all instances.
+_bucket_regions: Dict[Tuple[str, str], str] = {}
+
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 4
+DEFAULT_PRESIGNED_EXPIRES = timedelta(minutes=15)
+DEFAULT_URL_EXPIRES = 3600
+DEFAULT_METADATA_TTL = 60
+DEFAULT_METADATA_NEGATIVE_TTL = 10
+DEFAULT_REGION = "us-east-1"
+HTTP_TIMEOUT = 300
+MAX_PRESIGNED_EXPIRES = timedelta(days=7)
+ASYNC_ATTEMPTS = 5
+ASYNC_RETRY_STATUSES = (500, 502, 503, 504)
+ASYNC_RETRY_BACKOFF = 0.2
+# Bodies larger than this are signed (hashed) in a worker thread instead of on the event loop.
+SIGN_IN_THREAD_SIZE = 1024 * 1024
+
+
+class _UploadProgress:
+    """Byte counter passed to ``put_object`` as its ``progress`` object."""
+
+    def __init__(self):
+        self.uploaded = 0
+
+    def set_meta(self, object_name, total_length):
+        pass
+
+    def update(self, length):
+        self.uploaded += length
+
+
+class _MetricsRetry(Retry):
+    """urllib3 ``Retry`` that counts every retry of the Minio client in the storage metrics."""
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        record_retry(MinioStorage.metrics_backend)
+        return retry
 
 
 @deconstructible
@@ -20,6 +87,7 @@ class MinioStorage(Storage):
     - STORAGE_MINIO_SECRET_KEY
     - STORAGE_MINIO_SECURE
     - STORAGE_MINIO_BUCKET_NAME
+    - STORAGE_MINIO_REGION (looked up once with GetBucketLocation when not set)
     
     # For Django 4.2+
     STORAGES = {
@@ -46,6 +114,8 @@ class MinioStorage(Storage):
     DEFAULT_FILE_STORAGE = "django_library.core.files.storage.MinioStorage"
     """
 
+    metrics_backend = "minio"
+
     def __init__(
         self,
         bucket_name: Optional[str] = None,
@@ -53,6 +123,17 @@ class MinioStorage(Storage):
         access_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         secure: Optional[bool] = None,
+        read_buffer_size: Optional[int] = None,
+        part_size: Optional[int] = None,
+        upload_workers: Optional[int] = None,
+        signed_urls: Optional[bool] = None,
+        url_expires: Optional[int] = None,
+        metadata_ttl: Optional[float] = None,
+        metadata_negative_ttl: Optional[float] = None,
+        content_addressed: Optional[bool] = None,
+        content_prefix: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        region: Optional[str] = None,
     ):
         from django.conf import settings
 
@@ -71,13 +152,60 @@ class MinioStorage(Storage):
             raise ValueError(error_msg)
 
         self.bucket_name = bucket_name
+        self.read_buffer_size = read_buffer_size or getattr(
+            settings, "STORAGE_MINIO_READ_BUFFER_SIZE", DEFAULT_READ_BUFFER_SIZE
+        )
+        self.part_size = part_size or getattr(settings, "STORAGE_MINIO_PART_SIZE", DEFAULT_PART_SIZE)
+        self.upload_workers = upload_workers or getattr(settings, "STORAGE_MINIO_UPLOAD_WORKERS", DEFAULT_UPLOAD_WORKERS)
+
+        self.signed_urls = (
+            signed_urls if signed_urls is not None else getattr(settings, "STORAGE_MINIO_SIGNED_URLS", False)
+        )
+        self.url_expires = url_expires or getattr(settings, "STORAGE_MINIO_URL_EXPIRES", DEFAULT_URL_EXPIRES)
+        self._signed_urls = TTLCache(ttl=signed_url_ttl(self.url_expires))
+        self.metadata_negative_ttl = (
+            metadata_negative_ttl
+            if metadata_negative_ttl is not None
+            else getattr(settings, "STORAGE_MINIO_METADATA_NEGATIVE_TTL", DEFAULT_METADATA_NEGATIVE_TTL)
+        )
+        self._metadata = TTLCache(
+            ttl=metadata_ttl
+            if metadata_ttl is not None
+            else getattr(settings, "STORAGE_MINIO_METADATA_TTL", DEFAULT_METADATA_TTL)
+        )
+
+        self.content_addressed = (
+            content_addressed
+            if content_addressed is not None
+            else getattr(settings, "STORAGE_MINIO_CONTENT_ADDRESSED", False)
+        )
+        self.content_prefix = (
+            content_prefix if content_prefix is not None else getattr(settings, "STORAGE_MINIO_CONTENT_PREFIX", "")
+        )
+        self.pool_size = pool_size or getattr(settings, "STORAGE_MINIO_POOL_SIZE", DEFAULT_ASYNC_POOL_SIZE)
+        self.region = region or getattr(settings, "STORAGE_MINIO_REGION", None)
+
+        if self.part_size < MIN_PART_SIZE:
+            raise ValueError(f"Minio part_size must be at least {MIN_PART_SIZE} bytes.")
+
         self._protocol = "https" if secure else "http"
         self._base_url = f"{self._protocol}://{endpoint}"
+        self._credentials = Credentials(access_key, secret_key)
+        # Same pool settings as the Minio client's default, with a Retry that reports the retries it makes.
+        self._http = urllib3.PoolManager(
+            timeout=Timeout(connect=HTTP_TIMEOUT, read=HTTP_TIMEOUT),
+            maxsize=10,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+            retries=_MetricsRetry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        )
         self.minio = Minio(
             endpoint=endpoint,
             access_key=access_key,
             secret_key=secret_key,
             secure=secure,
+            region=self.region,
+            http_client=self._http,
         )
 
     @staticmethod
@@ -99,63 +227,518 @@ class MinioStorage(Storage):
 
         size = getattr(content, "size", None)
         if size is None:
-            buf = BytesIO()
             try:
+                size = file_obj.seek(0, os.SEEK_END)
                 file_obj.seek(0)
             except Exception:
-                pass
-            buf.write(file_obj.read())
-            buf.seek(0)
-            file_obj = buf
-            size = buf.getbuffer().nbytes
+                size = -1
 
         return file_obj, int(size)
 
+    @instrumented("save")
     def save(self, name: str, content, max_length=None):
         file_obj, size = self._get_file_obj_and_size(content)
         content_type = getattr(content, "content_type", "application/octet-stream")
 
+        if self.content_addressed:
+            file_obj, digest, size = hash_content(file_obj)
+            name = content_addressed_name(name, digest, self.content_prefix)
+            if self._stat(name) is not None:
+                logger.debug(f"{name} already stored, skipping upload")
+                return name
+
         try:
             file_obj.seek(0)
         except Exception:
             pass
 
+        progress = _UploadProgress()
+        started_at = time.perf_counter()
+
         self.minio.put_object(
             bucket_name=self.bucket_name,
             object_name=name,
             data=file_obj,
             length=size,
             content_type=content_type,
+            part_size=self.part_size,
+            num_parallel_uploads=self.upload_workers,
+            progress=progress,
+        )
+        self._metadata.delete(name)
+        record_bytes(self.metrics_backend, progress.uploaded, "save")
+
+        elapsed = time.perf_counter() - started_at
+        logger.debug(
+            f"{name} uploaded {progress.uploaded} bytes in {elapsed:.3f}s "
+            f"({progress.uploaded / elapsed / 1024 / 1024 if elapsed else 0:.2f} MiB/s)",
+            extra={"bytes": progress.uploaded, "latency_ms": round(elapsed * 1000, 3)},
         )
 
         return name
 
-    def open(self, name: str, mode: str = "rb"):
-        response = self.minio.get_object(self.bucket_name, name)
+    def _stat(self, name: str):
+        """Return the cached ``stat_object`` result for ``name`` (``None`` if missing)."""
+        stat = self._metadata.get(name, _MISSING)
+        if stat is not _MISSING:
+            return stat
+
         try:
-            data = response.read()
-            buf = BytesIO(data)
-            buf.seek(0)
-            return File(buf, name)
-        finally:
-            response.close()
-            response.release_conn()
+            stat = self.minio.stat_object(self.bucket_name, name)
+        except S3Error:
+            self._metadata.set(name, None, ttl=self.metadata_negative_ttl)
+            return None
 
+        self._metadata.set(name, stat)
+        return stat
+
+    def _stat_or_raise(self, name: str):
+        stat = self._stat(name)
+        if stat is None:
+            raise FileNotFoundError(name)
+        return stat
+
+    @instrumented("open")
+    def open(self, name: str, mode: str = "rb"):
+        stat = self._stat_or_raise(name)
+
+        def open_range(offset: int):
+            with track(self.metrics_backend, "download"):
+                return self.minio.get_object(self.bucket_name, name, offset=offset)
+
+        on_read = functools.partial(record_bytes, self.metrics_backend, operation="download")
+        return RemoteFile(RangeReader(open_range, stat.size, on_read), name, stat.size, self.read_buffer_size)
+
+    @instrumented("exists")
     def exists(self, name: str) -> bool:
-        try:
-            self.minio.stat_object(self.bucket_name, name)
+        return self._stat(name) is not None
+
+    @instrumented("size")
+    def size(self, name: str) -> int:
+        return self._stat_or_raise(name).size
+
+    @instrumented("get_version")
+    def get_version(self, name: str) -> str:
+        stat = self._stat_or_raise(name)
+        return stat.etag or str(stat.last_modified)
+
+    @instrumented("get_modified_time")
+    def get_modified_time(self, name: str) -> datetime:
+        from django.conf import settings
+        from django.utils import timezone as django_timezone
+
+        last_modified = self._stat_or_raise(name).last_modified
+        if settings.USE_TZ:
+            return last_modified
+        return django_timezone.make_naive(last_modified)
+
+    @instrumented("listdir")
+    def listdir(self, path: str):
+        prefix = path.strip("/")
+        prefix = f"{prefix}/" if prefix else ""
+
+        directories, files = [], []
+        for obj in self.minio.list_objects(self.bucket_name, prefix=prefix, recursive=False):
+            if obj.is_dir:
+                directories.append(obj.object_name[len(prefix):].rstrip("/"))
+            else:
+                files.append(obj.object_name[len(prefix):])
+                self._metadata.set(obj.object_name, obj)
+
+        return directories, files
+
+    def _is_shared(self, name: str) -> bool:
+        """Content-addressed objects may back several rows; only ``cleanup_storage`` removes them."""
+        if self.content_addressed and is_content_addressed_name(name, self.content_prefix):
+            logger.debug(f"{name} is content-addressed, keeping it for cleanup_storage")
             return True
-        except S3Error:
-            return False
+        return False
 
+    @instrumented("delete")
     def delete(self, name: str) -> None:
+        if self._is_shared(name):
+            return
+
         try:
             self.minio.remove_object(bucket_name=self.bucket_name, object_name=name)
         except S3Error:
             pass
+        finally:
+            self._metadata.delete(name)
+
+    @instrumented("delete_many")
+    def delete_many(self, names: Iterable[str]) -> List[str]:
+        """Delete ``names`` with batched ``remove_objects`` calls; return the names that failed.
+
+        Content-addressed objects are deleted too: callers must have checked that nothing references them.
+        """
+        names = list(names)
+        errors = self.minio.remove_objects(self.bucket_name, (DeleteObject(name) for name in names))
+        failed = [error.name for error in errors]
+
+        for name in names:
+            self._metadata.delete(name)
+
+        return failed
+
+    def iter_objects(self, prefix: str = "") -> Iterator[Tuple[str, datetime]]:
+        for obj in self.minio.list_objects(self.bucket_name, prefix=prefix or None, recursive=True):
+            yield obj.object_name, obj.last_modified
+
+    @staticmethod
+    def _parse_location(body: bytes) -> str:
+        region = ElementTree.fromstring(body).text
+        if not region:
+            return DEFAULT_REGION
+        return "eu-west-1" if region == "EU" else region
+
+    def bucket_region(self) -> str:
+        """``STORAGE_MINIO_REGION``, or the bucket's region looked up once per process."""
+        if self.region:
+            return self.region
+
+        key = (self._base_url, self.bucket_name)
+        region = _bucket_regions.get(key)
+        if region is None:
+            url = self._presign("GET", None, query="location", region=DEFAULT_REGION)
+            response = self._http.request("GET", url)
+            if response.status >= 400:
+                raise ServerError(
+                    f"GetBucketLocation of {self.bucket_name} failed with HTTP {response.status}.", response.status
+                )
+            region = _bucket_regions[key] = self._parse_location(response.data)
+        return region
+
+    def _presign(
+        self,
+        method: str,
+        name: Optional[str],
+        expires: timedelta = DEFAULT_PRESIGNED_EXPIRES,
+        headers: Optional[Dict[str, str]] = None,
+        query: str = "",
+        region: Optional[str] = None,
+    ) -> str:
+        if not timedelta(seconds=1) <= expires <= MAX_PRESIGNED_EXPIRES:
+            raise ValueError("expires must be between 1 second and 7 days.")
+
+        url = object_url(self._base_url, self.bucket_name, name)
+        if query:
+            url = f"{url}?{query}"
+        return presign_v4(
+            method,
+            url,
+            region or self.bucket_region(),
+            self._credentials.access_key,
+            self._credentials.secret_key,
+            int(expires.total_seconds()),
+            headers=headers,
+        )
+
+    def presigned_put_url(
+        self,
+        name: str,
+        expires: timedelta = DEFAULT_PRESIGNED_EXPIRES,
+        content_type: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> str:
+        """Presigned PUT URL; ``content_type`` and ``size`` are signed, so the upload must send exactly those."""
+        headers = {}
+        if content_type:
+            headers["Content-Type"] = content_type
+        if size is not None:
+            headers["Content-Length"] = str(size)
+        return self._presign("PUT", name, expires=expires, headers=headers)
+
+    def presigned_post_policy(
+        self,
+        name: str,
+        content_type: Optional[str] = None,
+        max_size: Optional[int] = None,
+        expires: timedelta = DEFAULT_PRESIGNED_EXPIRES,
+    ) -> Dict[str, object]:
+        policy = PostPolicy(self.bucket_name, datetime.now(timezone.utc) + expires)
+        policy.add_equals_condition("key", name)
+
+        fields = {"key": name}
+        if content_type:
+            policy.add_equals_condition("Content-Type", content_type)
+            fields["Content-Type"] = content_type
+        if max_size:
+            policy.add_content_length_range_condition(1, max_size)
+
+        fields.update(self.minio.presigned_post_policy(policy))
+        return {"url": f"{self._base_url}/{self.bucket_name}", "fields": fields}
+
+    def confirm_upload(
+        self,
+        name: str,
+        max_size: Optional[int] = None,
+        content_types: Optional[Iterable[str]] = None,
+    ):
+        """Verify a direct-to-bucket upload and return its ``stat_object`` result.
+
+        Raises ``FileNotFoundError`` if the object is missing and ``ValueError``
+        if it breaks the size or content-type constraints.
+        """
+        self._metadata.delete(name)
+        stat = self._stat_or_raise(name)
+
+        if max_size is not None and stat.size > max_size:
+            raise ValueError(f"{name} is {stat.size} bytes, larger than {max_size}.")
+
+        if content_types and stat.content_type not in content_types:
+            raise ValueError(f"{name} has content type {stat.content_type}.")
+
+        return stat
 
     def url(self, name: str) -> str:
+        if self.signed_urls:
+            return self.signed_url(name)
+
         return f"{self._base_url}/{self.bucket_name}/{name}"
 
+    def urls(self, names: Iterable[str]) -> List[str]:
+        """``url()`` for many names at once, resolving each distinct name only once."""
+        if not self.signed_urls:
+            prefix = f"{self._base_url}/{self.bucket_name}/"
+            return [prefix + name for name in names]
+        return resolve_many(names, self.signed_url)
+
+    def signed_url(self, name: str, expires: Optional[int] = None) -> str:
+        if expires is not None:
+            return self._presign("GET", name, expires=timedelta(seconds=expires))
+
+        url = self._signed_urls.get(name)
+        if url is None:
+            url = self._presign("GET", name, expires=timedelta(seconds=self.url_expires))
+            self._signed_urls.set(name, url)
+
+        return url
+
     def _temporary_storage(self, contents=None):
         return NamedTemporaryFile(mode="w+b", delete=True)
+
+    # Async API: native coroutines over a pooled httpx client, signed with the public minio.signer functions.
+
+    def _sign(self, method: str, region: str, name: Optional[str], query=None, headers=None, body=None):
+        """Signed ``(url, headers)`` for a request to ``name`` (to the bucket itself when ``None``)."""
+        url = object_url(self._base_url, self.bucket_name, name)
+        if query:
+            # Every reserved character is encoded, "/" included, as S3 does when it builds the canonical query.
+            url += "?" + urlencode(sorted(query.items()), safe="", quote_via=quote)
+        parts = urlsplit(url)
+
+        date = utcnow()
+        # Plain HTTP payloads are hashed so the signature covers them; TLS already protects them in transit.
+        content_sha256 = UNSIGNED_PAYLOAD if self._protocol == "https" else hashlib.sha256(body or b"").hexdigest()
+        headers = {
+            **(headers or {}),
+            "Host": parts.netloc,
+            "x-amz-date": to_amz_date(date),
+            "x-amz-content-sha256": content_sha256,
+        }
+        if body is not None:
+            headers["Content-Length"] = str(len(body))
+        headers = sign_v4_s3(
+            method=method,
+            url=parts,
+            region=region,
+            headers=headers,
+            credentials=self._credentials,
+            content_sha256=content_sha256,
+            date=date,
+        )
+        return url, headers
+
+    async def _aregion(self) -> str:
+        if self.region:
+            return self.region
+        region = _bucket_regions.get((self._base_url, self.bucket_name))
+        if region:
+            return region
+        return await _region_lookups.run((self._base_url, self.bucket_name), self._alookup_region)
+
+    async def _alookup_region(self) -> str:
+        response = await self._arequest("GET", None, query={"location": ""}, region=DEFAULT_REGION)
+        response.raise_for_status()
+        region = _bucket_regions[(self._base_url, self.bucket_name)] = self._parse_location(response.content)
+        return region
+
+    async def _arequest(
+        self, method: str, name: Optional[str], query=None, headers=None, body=None, stream=False, region=None
+    ):
+        """Signed request to the bucket; transport errors and 5xx responses are retried like the sync client does."""
+        region = region or await self._aregion()
+        client = get_async_client(self.pool_size)
+
+        for attempt in range(ASYNC_ATTEMPTS):
+            if body is not None and len(body) > SIGN_IN_THREAD_SIZE:
+                url, signed_headers = await asyncio.to_thread(self._sign, method, region, name, query, headers, body)
+            else:
+                url, signed_headers = self._sign(method, region, name, query, headers, body)
+
+            request = client.build_request(method, url, headers=signed_headers, content=body)
+            try:
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError:
+                if attempt + 1 == ASYNC_ATTEMPTS:
+                    raise
+            else:
+                if response.status_code not in ASYNC_RETRY_STATUSES or attempt + 1 == ASYNC_ATTEMPTS:
+                    return response
+                await response.aclose()
+
+            record_retry(self.metrics_backend)
+            await asyncio.sleep(ASYNC_RETRY_BACKOFF * 2 ** attempt)
+
+    async def _astat(self, name: str):
+        stat = self._metadata.get(name, _MISSING)
+        if stat is not _MISSING:
+            return stat
+
+        response = await self._arequest("HEAD", name)
+        if response.status_code >= 500:
+            response.raise_for_status()
+        if response.status_code >= 400:
+            self._metadata.set(name, None, ttl=self.metadata_negative_ttl)
+            return None
+
+        last_modified = response.headers.get("last-modified")
+        stat = Object(
+            self.bucket_name,
+            name,
+            last_modified=from_http_header(last_modified) if last_modified else None,
+            etag=response.headers.get("etag", "").replace('"', ""),
+            size=int(response.headers.get("content-length", 0)),
+            content_type=response.headers.get("content-type"),
+        )
+        self._metadata.set(name, stat)
+        return stat
+
+    async def _astat_or_raise(self, name: str):
+        stat = await self._astat(name)
+        if stat is None:
+            raise FileNotFoundError(name)
+        return stat
+
+    @instrumented("exists")
+    async def aexists(self, name: str) -> bool:
+        return await self._astat(name) is not None
+
+    @instrumented("save")
+    async def asave(self, name: str, content, max_length=None):
+        file_obj, _size = self._get_file_obj_and_size(content)
+        content_type = getattr(content, "content_type", "application/octet-stream")
+
+        if self.content_addressed:
+            file_obj, digest, _size = await asyncio.to_thread(hash_content, file_obj)
+            name = content_addressed_name(name, digest, self.content_prefix)
+            if await self._astat(name) is not None:
+                return name
+
+        try:
+            file_obj.seek(0)
+        except Exception:
+            pass
+
+        # Objects up to one part go up in a single PUT; larger ones (or streams of unknown size) as multipart.
+        data = await asyncio.to_thread(file_obj.read, self.part_size)
+        if len(data) < self.part_size:
+            response = await self._arequest("PUT", name, headers={"Content-Type": content_type}, body=data)
+            response.raise_for_status()
+            uploaded = len(data)
+        else:
+            uploaded = await self._asave_multipart(name, file_obj, data, content_type)
+
+        self._metadata.delete(name)
+        record_bytes(self.metrics_backend, uploaded, "save")
+        return name
+
+    async def _asave_multipart(self, name: str, file_obj, data: bytes, content_type: str) -> int:
+        """Multipart upload with ``upload_workers`` parts in flight; returns the bytes uploaded."""
+        response = await self._arequest("POST", name, query={"uploads": ""}, headers={"Content-Type": content_type})
+        response.raise_for_status()
+        upload_id = ElementTree.fromstring(response.content).findtext("{*}UploadId")
+
+        slots = asyncio.Semaphore(self.upload_workers)
+        tasks = []
+
+        async def upload_part(number, part):
+            try:
+                response = await self._arequest(
+                    "PUT", name, query={"partNumber": str(number), "uploadId": upload_id}, body=part
+                )
+                response.raise_for_status()
+                return response.headers["etag"].replace('"', "")
+            finally:
+                slots.release()
+
+        uploaded = 0
+        try:
+            while data:
+                await slots.acquire()
+                for task in tasks:
+                    if task.done() and task.exception() is not None:
+                        raise task.exception()
+                tasks.append(asyncio.ensure_future(upload_part(len(tasks) + 1, data)))
+                uploaded += len(data)
+                data = await asyncio.to_thread(file_obj.read, self.part_size)
+
+            etags = await asyncio.gather(*tasks)
+            parts = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{escape(etag)}</ETag></Part>"
+                for number, etag in enumerate(etags, 1)
+            )
+            response = await self._arequest(
+                "POST",
+                name,
+                query={"uploadId": upload_id},
+                body=f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode(),
+            )
+            response.raise_for_status()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self._arequest("DELETE", name, query={"uploadId": upload_id})
+            except Exception:
+                pass
+            raise
+
+        return uploaded
+
+    @instrumented("open")
+    async def aopen(self, name: str, mode: str = "rb") -> AsyncRemoteFile:
+        stat = await self._astat_or_raise(name)
+
+        async def open_range(offset: int):
+            with track(self.metrics_backend, "download"):
+                headers = {"Range": f"bytes={offset}-"} if offset else None
+                response = await self._arequest("GET", name, headers=headers, stream=True)
+                if response.status_code >= 400:
+                    await response.aclose()
+                    if response.status_code == 404:
+                        self._metadata.delete(name)
+                        raise FileNotFoundError(name)
+                    response.raise_for_status()
+                return response
+
+        on_read = functools.partial(record_bytes, self.metrics_backend, operation="download")
+        return AsyncRemoteFile(open_range, name, stat.size, self.read_buffer_size, on_read)
+
+    @instrumented("delete")
+    async def adelete(self, name: str) -> None:
+        if self._is_shared(name):
+            return
+
+        try:
+            await self._arequest("DELETE", name)
+        finally:
+            self._metadata.delete(name)
+
+    async def aurl(self, name: str) -> str:
+        if self.signed_urls and self._signed_urls.get(name) is None:
+            # Presigning is local once the bucket region is known; look it up without blocking.
+            await self._aregion()
+        return self.url(name)
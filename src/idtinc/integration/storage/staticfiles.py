@@ -1,12 +1,163 @@
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
                                                 StaticFilesStorage)
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_COMPRESS_EXTENSIONS = (
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml", ".ico", ".wasm", ".ttf", ".otf", ".eot"
+)
+DEFAULT_COMPRESS_MIN_SIZE = 256
+# Variants that do not save at least 5% are not worth a separate file.
+MAX_COMPRESS_RATIO = 0.95
+
+
+def compress_file(path, encodings):
+    """Write ``<path>.gz``/``<path>.br`` next to ``path``; return the suffixes that were kept."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    written = []
+    for encoding in encodings:
+        if encoding == "gz":
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = brotli.compress(data, quality=11)
+
+        target = f"{path}.{encoding}"
+        if len(compressed) > len(data) * MAX_COMPRESS_RATIO:
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+
+        with open(target, "wb") as f:
+            f.write(compressed)
+        written.append(encoding)
+
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """``ManifestStaticFilesStorage`` that also writes ``.gz`` and ``.br`` variants.
+
+    After ``collectstatic`` hashes the files, every hashed file with a
+    compressible extension is compressed in a process pool. The variants are
+    recorded in the manifest under ``"compressed"``. Hashed names change with
+    their content, so files already compressed by a previous run are skipped.
+    ``.br`` files are written only when ``brotli`` is installed
+    (``pip install idtinc[brotli]``).
+
+    Reads configuration from Django settings:
+    - STORAGE_STATICFILES_COMPRESS_WORKERS
+    - STORAGE_STATICFILES_COMPRESS_EXTENSIONS
+    - STORAGE_STATICFILES_COMPRESS_MIN_SIZE
+    """
+
+    def __init__(self, *args, **kwargs):
+        from django.conf import settings
+
+        super().__init__(*args, **kwargs)
+        self.compress_workers = getattr(settings, "STORAGE_STATICFILES_COMPRESS_WORKERS", None) or os.cpu_count() or 1
+        self.compress_extensions = tuple(
+            getattr(settings, "STORAGE_STATICFILES_COMPRESS_EXTENSIONS", DEFAULT_COMPRESS_EXTENSIONS)
+        )
+        self.compress_min_size = getattr(settings, "STORAGE_STATICFILES_COMPRESS_MIN_SIZE", DEFAULT_COMPRESS_MIN_SIZE)
+        self.encodings = ("gz", "br") if brotli is not None else ("gz",)
+        self.compressed_files = {}
+        self._defer_manifest = False
+
+    def read_compressed_manifest(self):
+        """Compressed variants recorded by the previous run, if it used the same encodings."""
+        content = self.read_manifest()
+        if content is None:
+            return {}
+
+        try:
+            compressed = json.loads(content).get("compressed") or {}
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+
+        if compressed.get("encodings") != list(self.encodings):
+            return {}
+        return compressed.get("files", {})
+
+    def save_manifest(self):
+        """Write the manifest in one go, with the compressed variants next to the hashed paths.
+
+        Same payload as ``ManifestFilesMixin.save_manifest()``, plus ``"compressed"``.
+        """
+        if self._defer_manifest:
+            return
+
+        payload = {"paths": self.hashed_files, "version": self.manifest_version}
+        if hasattr(self, "manifest_hash"):  # Django 4.2+
+            self.manifest_hash = self.file_hash(
+                None, ContentFile(json.dumps(sorted(self.hashed_files.items())).encode())
+            )
+            payload["hash"] = self.manifest_hash
+        if self.compressed_files:
+            payload["compressed"] = {"encodings": list(self.encodings), "files": self.compressed_files}
+
+        storage = getattr(self, "manifest_storage", self)
+        if storage.exists(self.manifest_name):
+            storage.delete(self.manifest_name)
+        storage._save(self.manifest_name, ContentFile(json.dumps(payload).encode()))
+
+    def should_compress(self, name):
+        return name.endswith(self.compress_extensions) and self.size(name) >= self.compress_min_size
+
+    def post_process(self, paths, dry_run=False, **options):
+        previous = self.read_compressed_manifest()
+        self.compressed_files = {}
+        # The manifest is written once below, after the variants are known.
+        self._defer_manifest = True
+        try:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+        finally:
+            self._defer_manifest = False
+
+        if dry_run:
+            return
+
+        pending = []
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            if not self.should_compress(hashed_name):
+                continue
+
+            written = previous.get(hashed_name)
+            if written is not None and all(self.exists(f"{hashed_name}.{encoding}") for encoding in written):
+                self.compressed_files[hashed_name] = written
+            else:
+                pending.append(hashed_name)
+
+        if pending:
+            paths = [self.path(name) for name in pending]
+            encodings = [self.encodings] * len(pending)
+            if self.compress_workers > 1 and len(pending) > 1:
+                with ProcessPoolExecutor(max_workers=self.compress_workers) as executor:
+                    results = list(executor.map(compress_file, paths, encodings, chunksize=16))
+            else:
+                results = list(map(compress_file, paths, encodings))
+
+            # Variants are recorded in the manifest but not reported as post-processed files.
+            self.compressed_files.update(zip(pending, results))
+
+        self.save_manifest()
 
 
 class StaticFilesStorage(StaticFilesStorage):
     def __new__(cls, *args, **kwargs):
         from django.conf import settings
-        
+
         if not getattr(settings, "DEBUG", True):
-            return ManifestStaticFilesStorage(*args, **kwargs)
+            return CompressedManifestStaticFilesStorage(*args, **kwargs)
 
-        return super().__new__(cls, *args, **kwargs)
\ No newline at end of file
+        return super().__new__(cls, *args, **kwargs)
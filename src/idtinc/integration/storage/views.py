@@ -0,0 +1,175 @@
+import json
+import posixpath
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+from rest_framework import serializers
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from idtinc.core.message import Msg
+from idtinc.core.status import HttpStatus
+
+from ..validators import MessageError
+from ..views import APIView
+from .metrics import metrics
+
+UPLOAD_TICKET_SALT = "idtinc.integration.storage.upload"
+
+
+class PresignedUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+
+
+class ConfirmUploadSerializer(serializers.Serializer):
+    ticket = serializers.CharField()
+
+
+class PresignedUploadAPIView(APIView):
+    """Direct-to-bucket uploads.
+
+    ``POST`` validates the declared file and returns an upload ticket with a
+    presigned URL; the client uploads straight to the bucket. ``PUT`` with the
+    ticket confirms the upload by checking the stored object. Tickets are bound
+    to the user who requested them.
+
+    The declared size and content type are enforced by the bucket at upload
+    time: they are conditions of the POST policy, and are signed into the PUT
+    URL (the body must be exactly ``size`` bytes with that ``Content-Type``).
+
+    The storage must implement ``presigned_post_policy``/``presigned_put_url``
+    and ``confirm_upload`` (see ``MinioStorage``).
+    """
+
+    permission_classes: List[Any] = [IsAuthenticated]
+    serializer_class = PresignedUploadSerializer
+
+    storage = None
+    upload_to: str = "uploads"
+    upload_method: str = "post"
+    max_upload_size: Optional[int] = None
+    allowed_content_types: Optional[List[str]] = None
+    expires: timedelta = timedelta(minutes=15)
+    ticket_max_age: Optional[timedelta] = None
+
+    def get_storage(self):
+        return self.storage or default_storage
+
+    def get_upload_name(self, filename: str) -> str:
+        return posixpath.join(self.upload_to, uuid.uuid4().hex, get_valid_filename(filename))
+
+    def validate_upload(self, size: int, content_type: str) -> None:
+        if self.max_upload_size is not None and size > self.max_upload_size:
+            raise MessageError(Msg.UPLOAD_SIZE_EXCEEDED % {"max_size": self.max_upload_size})
+
+        if self.allowed_content_types is not None and content_type not in self.allowed_content_types:
+            raise MessageError(Msg.FILE_CONTENT_TYPE_INVALID % {"content_type": content_type})
+
+    def get_upload(self, storage, name: str, size: int, content_type: str) -> Dict[str, Any]:
+        if self.upload_method == "put":
+            return {
+                "method": "PUT",
+                "url": storage.presigned_put_url(name, expires=self.expires, content_type=content_type, size=size),
+                "fields": {},
+                "headers": {"Content-Type": content_type},
+            }
+
+        policy = storage.presigned_post_policy(name, content_type=content_type, max_size=size, expires=self.expires)
+        return {"method": "POST", "url": policy["url"], "fields": policy["fields"], "headers": {}}
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        data = self.validate_serializer(data=request.data)
+        self.validate_upload(data["size"], data["content_type"])
+
+        storage = self.get_storage()
+        if not hasattr(storage, "confirm_upload"):
+            raise MessageError(Msg.UPLOAD_NOT_SUPPORTED)
+
+        name = self.get_upload_name(data["filename"])
+        ticket = signing.dumps(
+            {
+                "name": name,
+                "size": data["size"],
+                "content_type": data["content_type"],
+                "user": request.user.pk,
+            },
+            salt=UPLOAD_TICKET_SALT,
+        )
+
+        return self.response(
+            data={
+                "name": name,
+                "ticket": ticket,
+                "expires_in": int(self.expires.total_seconds()),
+                **self.get_upload(storage, name, data["size"], data["content_type"]),
+            },
+            status=HttpStatus.CREATED,
+        )
+
+    def put(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = ConfirmUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        max_age = self.ticket_max_age or self.expires * 2
+        try:
+            ticket = signing.loads(serializer.validated_data["ticket"], salt=UPLOAD_TICKET_SALT, max_age=max_age)
+        except signing.BadSignature:
+            raise MessageError(Msg.UPLOAD_TICKET_INVALID)
+
+        if ticket.get("user") != request.user.pk:
+            raise MessageError(Msg.UPLOAD_TICKET_INVALID, status_code=HttpStatus.FORBIDDEN.value)
+
+        storage = self.get_storage()
+        name = ticket["name"]
+
+        try:
+            stat = storage.confirm_upload(name, max_size=ticket["size"], content_types=[ticket["content_type"]])
+        except FileNotFoundError:
+            raise MessageError(Msg.UPLOAD_NOT_FOUND, status_code=HttpStatus.NOT_FOUND.value)
+        except ValueError:
+            storage.delete(name)
+            raise MessageError(Msg.UPLOAD_TICKET_INVALID)
+
+        return self.response(data=self.upload_confirmed(storage, name, stat))
+
+    def upload_confirmed(self, storage, name: str, stat) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "size": stat.size,
+            "content_type": stat.content_type,
+            "url": storage.url(name),
+        }
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data if isinstance(data, str) else json.dumps(data, default=str)
+
+
+class StorageMetricsAPIView(APIView):
+    """Storage operation counts, bytes, retries, errors and latency histograms of this process.
+
+    ``GET`` returns them as JSON, or in the Prometheus text format with
+    ``?format=prometheus`` or ``Accept: text/plain``.
+    """
+
+    permission_classes: List[Any] = [IsAdminUser]
+    renderer_classes = [JSONRenderer, PrometheusRenderer]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if request.accepted_renderer.format == PrometheusRenderer.format:
+            return Response(metrics.render_prometheus())
+
+        return self.response(data={"buckets": list(metrics.buckets), "operations": metrics.snapshot()})
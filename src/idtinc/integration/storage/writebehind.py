@@ -0,0 +1,351 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+from .cached import DEFAULT_CHUNK_SIZE, file_lock
+from .files import content_addressed_name, is_content_addressed_name
+from .metrics import instrumented, record_retry, track
+
+logger = logging.getLogger("storage")
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_DELAY = 1.0
+ORPHAN_SPOOL_AGE = 3600
+
+
+def _fsync_write(path: str, data: bytes) -> None:
+    """Atomically replace ``path`` with ``data`` and flush it to disk."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+@deconstructible
+class WriteBehindStorage(Storage):
+    """Write-behind wrapper: ``save()`` spools to local disk and uploads in the background.
+
+    ``save()`` writes the content and a journal entry under ``directory`` and
+    returns the final name immediately; a thread pool uploads it to the backend,
+    retrying with exponential backoff. Until an upload is confirmed, ``open()``,
+    ``exists()`` and ``size()`` are served from the spool. Journal entries are
+    fsynced, so uploads still pending when the process stops are requeued when
+    the storage is next instantiated (or by the ``recover_uploads`` command for
+    processes that never touch the storage). The spool directory can be shared
+    by several workers.
+
+    If the backend is content-addressed (``content_addressed=True``), ``save()``
+    hashes the content while spooling it and returns the digest name the
+    backend will store it under.
+
+    Reads configuration from Django settings when not provided explicitly:
+    - STORAGE_WRITE_BEHIND_BACKEND (import path, e.g. "idtinc.integration.storage.MinioStorage")
+    - STORAGE_WRITE_BEHIND_OPTIONS
+    - STORAGE_WRITE_BEHIND_DIRECTORY
+    - STORAGE_WRITE_BEHIND_WORKERS
+    - STORAGE_WRITE_BEHIND_MAX_RETRIES
+    - STORAGE_WRITE_BEHIND_RETRY_DELAY
+    """
+
+    metrics_backend = "write_behind"
+
+    def __init__(
+        self,
+        backend=None,
+        options: Optional[dict] = None,
+        directory: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+    ):
+        from django.conf import settings
+
+        backend = backend or getattr(settings, "STORAGE_WRITE_BEHIND_BACKEND", None)
+        if not backend:
+            raise ValueError("WriteBehindStorage requires a backend.")
+
+        if isinstance(backend, str):
+            options = options if options is not None else getattr(settings, "STORAGE_WRITE_BEHIND_OPTIONS", {})
+            backend = import_string(backend)(**options)
+
+        self.storage = backend
+        self.directory = directory or getattr(
+            settings,
+            "STORAGE_WRITE_BEHIND_DIRECTORY",
+            os.path.join(tempfile.gettempdir(), "idtinc-storage-spool"),
+        )
+        self.workers = workers or getattr(settings, "STORAGE_WRITE_BEHIND_WORKERS", DEFAULT_WORKERS)
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else getattr(settings, "STORAGE_WRITE_BEHIND_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+        )
+        self.retry_delay = (
+            retry_delay if retry_delay is not None
+            else getattr(settings, "STORAGE_WRITE_BEHIND_RETRY_DELAY", DEFAULT_RETRY_DELAY)
+        )
+
+        self._executor = None
+        self._pid = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._ensure_started()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(name.encode("utf-8")).hexdigest())
+
+    def _read_journal(self, path: str) -> Optional[dict]:
+        try:
+            with open(f"{path}.json") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _ensure_started(self) -> None:
+        """Start the upload pool once per process and requeue journaled uploads."""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="storage-upload")
+            self._inflight = 0
+            self._pid = os.getpid()
+
+        self.recover()
+
+    def recover(self) -> int:
+        """Requeue every upload left in the journal; return how many were queued."""
+        queued = 0
+        now = time.time()
+
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if filename.endswith(".json"):
+                self._submit(path[: -len(".json")], attempt=0)
+                queued += 1
+            elif "." not in filename and not os.path.exists(f"{path}.json"):
+                # Data spooled by a save() that crashed before writing its journal entry.
+                with contextlib.suppress(FileNotFoundError):
+                    if now - os.path.getmtime(path) > ORPHAN_SPOOL_AGE:
+                        os.remove(path)
+
+        if queued:
+            logger.info(f"Requeued {queued} pending uploads from {self.directory}")
+        return queued
+
+    def _submit(self, path: str, attempt: int) -> None:
+        with self._lock:
+            self._inflight += 1
+        self._executor.submit(self._upload, path, attempt)
+
+    def _done(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+            if self._inflight == 0:
+                self._idle.notify_all()
+
+    def _upload(self, path: str, attempt: int) -> None:
+        retry = False
+        try:
+            if not os.path.exists(f"{path}.json"):
+                # Already uploaded or deleted; locking would only leave a new lock file behind.
+                return
+
+            with file_lock(f"{path}.lock", blocking=False) as locked:
+                if not locked:
+                    # Another thread or process is uploading this entry.
+                    return
+
+                entry = self._read_journal(path)
+                if entry is None:
+                    # Finished between the check and the lock; drop the lock file this call created.
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(f"{path}.lock")
+                    return
+
+                try:
+                    with open(path, "rb") as f:
+                        content = File(f, entry["name"])
+                        content.content_type = entry.get("content_type") or "application/octet-stream"
+                        with track(self.metrics_backend, "upload"):
+                            stored_name = self.storage.save(entry["name"], content)
+                    if stored_name != entry["name"]:
+                        logger.error(f"{entry['name']} was stored as {stored_name}, references to it are broken")
+                except FileNotFoundError:
+                    logger.error(f"Spool file for {entry['name']} is missing, dropping the upload")
+                except Exception:
+                    if attempt + 1 >= self.max_retries:
+                        logger.exception(
+                            f"Upload of {entry['name']} failed after {attempt + 1} attempts, "
+                            "it will be retried on the next start"
+                        )
+                        return
+                    logger.warning(f"Upload of {entry['name']} failed (attempt {attempt + 1}), retrying", exc_info=True)
+                    retry = True
+                    return
+
+                # Unlinking the held lock is safe: file_lock() waiters notice and lock the new file instead.
+                for suffix in (".json", "", ".lock"):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(path + suffix)
+        finally:
+            if retry:
+                self._schedule_retry(path, attempt + 1)
+            self._done()
+
+    def _schedule_retry(self, path: str, attempt: int) -> None:
+        record_retry(self.metrics_backend, "upload")
+        with self._lock:
+            self._inflight += 1
+
+        def resubmit():
+            try:
+                self._executor.submit(self._upload, path, attempt)
+            except RuntimeError:
+                # Executor shut down; the journal entry is recovered on the next start.
+                self._done()
+
+        timer = threading.Timer(self.retry_delay * 2 ** (attempt - 1), resubmit)
+        timer.daemon = True
+        timer.start()
+
+    @instrumented("save")
+    def save(self, name, content, max_length=None):
+        self._ensure_started()
+
+        if name is None:
+            name = content.name
+        digest = hashlib.sha256() if getattr(self.storage, "content_addressed", False) else None
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                if hasattr(content, "seek"):
+                    with contextlib.suppress(Exception):
+                        content.seek(0)
+                for chunk in content.chunks(DEFAULT_CHUNK_SIZE) if hasattr(content, "chunks") else [content.read()]:
+                    tmp.write(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            if digest is not None:
+                # The name the backend stores the object under, so callers persist a name that will exist.
+                name = content_addressed_name(name, digest.hexdigest(), self.storage.content_prefix)
+            path = self._path(name)
+
+            with file_lock(f"{path}.lock"):
+                os.replace(tmp_path, path)
+                entry = {
+                    "name": name,
+                    "content_type": getattr(content, "content_type", None),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }
+                _fsync_write(f"{path}.json", json.dumps(entry).encode("utf-8"))
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+        self._submit(path, attempt=0)
+        return name
+
+    def is_pending(self, name: str) -> bool:
+        self._ensure_started()
+        return os.path.exists(f"{self._path(name)}.json")
+
+    def pending(self) -> List[str]:
+        """Names whose upload has not been confirmed yet."""
+        self._ensure_started()
+        names = []
+
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".json"):
+                entry = self._read_journal(os.path.join(self.directory, filename[: -len(".json")]))
+                if entry is not None:
+                    names.append(entry["name"])
+        return names
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued uploads (including retries) finish; return ``False`` on timeout."""
+        self._ensure_started()
+        with self._idle:
+            return self._idle.wait_for(lambda: self._inflight == 0, timeout=timeout)
+
+    def open(self, name, mode="rb"):
+        if self.is_pending(name):
+            try:
+                return File(open(self._path(name), mode), name)
+            except FileNotFoundError:
+                # Upload confirmed between the check and the open.
+                pass
+        return self.storage.open(name, mode)
+
+    def exists(self, name):
+        return self.is_pending(name) or self.storage.exists(name)
+
+    def size(self, name):
+        if self.is_pending(name):
+            with contextlib.suppress(FileNotFoundError):
+                return os.path.getsize(self._path(name))
+        return self.storage.size(name)
+
+    def delete(self, name):
+        self._ensure_started()
+        if getattr(self.storage, "content_addressed", False) and is_content_addressed_name(
+            name, self.storage.content_prefix
+        ):
+            # Shared with every row that saved the same content; the backend keeps it as well.
+            return
+
+        path = self._path(name)
+        with file_lock(f"{path}.lock"):
+            for suffix in (".json", "", ".lock"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path + suffix)
+        self.storage.delete(name)
+
+    def url(self, name):
+        return self.storage.url(name)
+
+    def listdir(self, path):
+        return self.storage.listdir(path)
+
+    def get_modified_time(self, name):
+        if self.is_pending(name):
+            with contextlib.suppress(FileNotFoundError):
+                return datetime.fromtimestamp(os.path.getmtime(self._path(name)), tz=timezone.utc)
+        return self.storage.get_modified_time(name)
+
+    def get_available_name(self, name, max_length=None):
+        return self.storage.get_available_name(name, max_length=max_length)
+
+    def __getattr__(self, name):
+        if name == "storage":
+            raise AttributeError(name)
+        return getattr(self.storage, name)
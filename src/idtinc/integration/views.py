@@ -1,11 +1,15 @@
 from functools import cached_property
 from typing import (Any, Callable, Dict, Generic, List, Optional, Type,
                     TypeVar, Union)
+from urllib.parse import quote, urlparse
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.storage import default_storage
 from django.db import transaction
 from django.db.models.query import QuerySet
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.http.response import HttpResponseRedirectBase
+from django.utils.encoding import iri_to_uri
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import mixins, views, viewsets
@@ -24,6 +28,17 @@ from .helpers import get_client_ip
 from .paginator import Paginator
 from .response import APIResponse
 
+try:
+    from django.utils.http import content_disposition_header
+except ImportError:  # Django < 4.2
+
+    def content_disposition_header(as_attachment, filename):
+        disposition = "attachment" if as_attachment else "inline"
+        if filename.isascii() and all(char == "\t" or " " <= char <= "~" for char in filename):
+            return '%s; filename="%s"' % (disposition, filename.replace("\\", "\\\\").replace('"', '\\"'))
+        return "%s; filename*=utf-8''%s" % (disposition, quote(filename))
+
+
 T = TypeVar("T")
 S = TypeVar("S", bound=Serializer)
 R = TypeVar("R")
@@ -127,6 +142,33 @@ class BaseAPIViewMixin(SerializerMixin[S], Generic[T, S]):
     ) -> Response:
         return Response(content_type=content_type, headers=headers, data=content, **kwargs)
 
+    def storage_file_response(
+        self,
+        name: str,
+        storage: Optional[Any] = None,
+        filename: Optional[str] = None,
+        accel_redirect_prefix: Optional[str] = None,
+    ) -> Union[HttpResponse, HttpResponseRedirect]:
+        from django.conf import settings
+
+        url = (storage or default_storage).url(name)
+        accel_redirect_prefix = accel_redirect_prefix or getattr(settings, "STORAGE_ACCEL_REDIRECT_PREFIX", None)
+
+        if not accel_redirect_prefix:
+            return HttpResponseRedirect(url)
+
+        parsed = urlparse(url)
+        target = f"{accel_redirect_prefix.rstrip('/')}/{parsed.netloc}{parsed.path}"
+        if parsed.query:
+            target = f"{target}?{parsed.query}"
+
+        response = HttpResponse(content_type="")
+        response["X-Accel-Redirect"] = iri_to_uri(target)
+        if filename:
+            response["Content-Disposition"] = content_disposition_header(True, filename)
+
+        return response
+
     def get_serializer_context(self) -> Dict[str, Any]:
         context = {"request": self.request, "format": self.format_kwarg, "view": self}
 
@@ -190,7 +232,10 @@ class BaseAPIViewMixin(SerializerMixin[S], Generic[T, S]):
         *args: Any,
         **kwargs: Any,
     ) -> Response:
-        if isinstance(response, FileResponse):
+        if isinstance(response, (FileResponse, HttpResponseRedirectBase)):
+            return response
+
+        if isinstance(response, HttpResponse) and response.has_header("X-Accel-Redirect"):
             return response
 
         if not isinstance(response, Response):